@@ -0,0 +1,164 @@
+"""Benchmarks des chemins chauds, sur portefeuilles synthétiques et fournisseurs simulés
+
+    python benchmarks/run.py                      # tailles 10, 1k, 100k
+    python benchmarks/run.py --sizes 10 1000      # plus rapide
+    python benchmarks/run.py --baseline ancien.json
+
+Les résultats (médiane, min) sont écrits en JSON avec le commit courant dans
+bench_output.txt ; --baseline compare à un fichier précédent et signale les
+régressions au-delà du seuil.
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+import stubs
+
+DEFAULT_SIZES = [10, 1000, 100000]
+# Plafonds des cas réseau simulés (au-delà, on mesurerait surtout le simulateur)
+MAX_FETCH_TICKERS = 1000
+MAX_COMPARE_TICKERS = 500
+REGRESSION_THRESHOLD = 1.25
+# Sous la milliseconde, le bruit de mesure domine : pas d'alerte
+NOISE_FLOOR = 0.001
+
+def bench(fn, setup=None, min_time=0.5, min_runs=3, max_runs=50):
+    """Médiane et minimum (secondes) de fn(), après un passage à vide ; setup() n'est pas chronométré"""
+    if setup:
+        setup()
+    fn()
+    times = []
+    started = time.perf_counter()
+    while len(times) < min_runs or (len(times) < max_runs and time.perf_counter() - started < min_time):
+        if setup:
+            setup()
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return {"median": statistics.median(times), "min": min(times), "runs": len(times)}
+
+def size_cases(n):
+    """Cas dépendant de la taille du portefeuille : {nom: (fn, setup)}"""
+    import storage
+    from crypto_prices import get_crypto_prices
+    from market_data import get_etf_comparison_data, get_stock_prices
+    from valuation import analyze_portfolio, calc_values, value_portfolio
+
+    data = stubs.synthetic_portfolio(n)
+    valuation = value_portfolio(data)
+    tickers = list(dict.fromkeys(p["ticker"] for p in data["bourse"]))
+
+    # État de référence d'une session (celui que garde st.session_state)
+    base = {}
+
+    def fresh_db():
+        storage.reset_data()
+        base.clear()
+
+    def saved_db():
+        fresh_db()
+        storage.save_data(data, base)
+
+    def one_change():
+        data["bourse"][0]["qty"] += 1
+        storage.save_data(data, base)
+
+    return {
+        "calc_values": (lambda: calc_values(data), None),
+        "analyze_portfolio": (lambda: analyze_portfolio(data, valuation), None),
+        "save_data (complet)": (lambda: storage.save_data(copy.deepcopy(data), {}), fresh_db),
+        "save_data (1 ligne)": (one_change, None),
+        "load_data (à froid)": (storage.load_data, saved_db),
+        "get_stock_prices": (lambda: get_stock_prices(tickers[:MAX_FETCH_TICKERS]), None),
+        "get_crypto_prices": (lambda: get_crypto_prices(data["crypto"][:MAX_FETCH_TICKERS]), None),
+        "comparateur (1y)": (lambda: get_etf_comparison_data(tickers[:MAX_COMPARE_TICKERS], "1y"), None),
+    }
+
+def fixed_cases():
+    """Cas indépendants de la taille : la page Simulation"""
+    from projection import lognormal_returns, monte_carlo, monthly_rate, project, scenario_grid
+    draw = lognormal_returns(8, 15)
+    return {
+        "projection 30 ans": (lambda: project(10000, 500, monthly_rate(8), 360), None),
+        "grille de scénarios": (lambda: scenario_grid(10000, np.arange(100, 2100, 100), np.arange(1, 16), 360, 100000), None),
+        "monte carlo 10k x 30 ans": (lambda: monte_carlo(10000, 500, 360, draw, n_paths=10000, cible=100000, seed=0), None),
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks Horizon Finance (sans réseau)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="nombres de positions")
+    parser.add_argument("--output", default=os.path.join(ROOT, "bench_output.txt"), help="fichier JSON des résultats")
+    parser.add_argument("--baseline", help="résultats précédents à comparer")
+    parser.add_argument("--min-time", type=float, default=0.5, help="durée minimale de mesure par cas (s)")
+    args = parser.parse_args()
+
+    # Bases SQLite dans un dossier jetable, fournisseurs simulés et sans limite de débit
+    workdir = tempfile.mkdtemp(prefix="horizon-bench-")
+    os.chdir(workdir)
+    stubs.install_fake_yfinance()
+    import crypto_prices
+    import resilience
+    crypto_prices._request = stubs.fake_coingecko
+    for provider in list(resilience.PROVIDERS):
+        resilience.configure(provider, rate=1e9, burst=1e9, backoff=0.0)
+
+    results = {}
+    print(f"{'cas':<28}{'positions':>10}{'médiane':>12}{'min':>12}{'runs':>6}")
+    for n in args.sizes:
+        for name, (fn, setup) in size_cases(n).items():
+            r = results.setdefault(name, {})[str(n)] = bench(fn, setup, min_time=args.min_time)
+            print(f"{name:<28}{n:>10}{r['median'] * 1000:>10.2f}ms{r['min'] * 1000:>10.2f}ms{r['runs']:>6}")
+    for name, (fn, setup) in fixed_cases().items():
+        r = results.setdefault(name, {})["-"] = bench(fn, setup, min_time=args.min_time)
+        print(f"{name:<28}{'-':>10}{r['median'] * 1000:>10.2f}ms{r['min'] * 1000:>10.2f}ms{r['runs']:>6}")
+
+    report = {
+        "commit": git_commit(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nRésultats : {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nComparaison avec {baseline.get('commit')} (médianes, seuil x{REGRESSION_THRESHOLD})")
+        regressions = 0
+        for name, by_size in results.items():
+            for size, r in by_size.items():
+                old = baseline["results"].get(name, {}).get(size)
+                if not old:
+                    continue
+                ratio = r["median"] / old["median"] if old["median"] > 0 else float("inf")
+                flag = "  ⚠️ régression" if ratio > REGRESSION_THRESHOLD and r["median"] > NOISE_FLOOR else ""
+                regressions += bool(flag)
+                print(f"{name:<28}{size:>10}{ratio:>10.2f}x{flag}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Portefeuilles synthétiques et fournisseurs simulés pour les benchmarks (aucun réseau)"""
+import sys
+import types
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from storage import get_default_data
+
+DAYS = {"1d": 1, "5d": 5, "1mo": 31, "3mo": 92, "6mo": 183, "1y": 366, "2y": 731, "5y": 1827, "10y": 3653}
+
+def synthetic_portfolio(n_positions, seed=0):
+    """Portefeuille de la forme de get_default_data() avec n_positions lignes (bourse ~80 %, crypto ~20 %)"""
+    rng = np.random.default_rng(seed)
+    data = get_default_data()
+    modeles_b, modeles_c = data["bourse"], data["crypto"]
+    suffixes = ["", ".PA", ".AS", ".L"]
+    n_crypto = max(1, n_positions // 5)
+    n_bourse = max(1, n_positions - n_crypto)
+    data["bourse"] = [
+        dict(modeles_b[i % len(modeles_b)], nom=f"Action {i}", ticker=f"S{i}{suffixes[i % len(suffixes)]}",
+             qty=float(rng.uniform(0.1, 50)), prix_achat=float(rng.uniform(5, 500)),
+             prix_actuel=float(rng.uniform(5, 500)), change_24h=float(rng.normal(0, 2)))
+        for i in range(n_bourse)
+    ]
+    data["crypto"] = [
+        dict(modeles_c[i % len(modeles_c)], nom=f"Coin {i}", ticker=f"C{i}", coingecko_id=f"coin-{i}",
+             qty=float(rng.uniform(0.01, 100)), prix_achat_usd=float(rng.uniform(0.1, 1000)),
+             prix_actuel_usd=float(rng.uniform(0.1, 1000)), change_24h=float(rng.normal(0, 4)))
+        for i in range(n_crypto)
+    ]
+    data["dca_orders"] = [
+        dict(data["dca_orders"][i % len(data["dca_orders"])], crypto=f"C{i}", nom=f"Coin {i}")
+        for i in range(max(1, n_positions // 100))
+    ]
+    return data
+
+def _series(ticker, index):
+    rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+    base = 1.1 if ticker == "EURUSD=X" else 20 + rng.random() * 200
+    return base * np.exp(np.cumsum(rng.normal(0.0003, 0.012, len(index))))
+
+def fake_download(tickers, period=None, start=None, interval="1d", **kwargs):
+    """Même forme que yf.download(group_by="column") : colonnes (champ, ticker)"""
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    end = pd.Timestamp("2026-01-02")
+    begin = pd.Timestamp(start) if start else end - pd.Timedelta(days=DAYS.get(period, 366))
+    index = pd.bdate_range(begin, end)
+    closes = {t: _series(t, index) for t in tickers}
+    df = pd.concat({"Close": pd.DataFrame(closes, index=index), "Open": pd.DataFrame(closes, index=index)}, axis=1)
+    df.columns.names = ["Price", "Ticker"]
+    return df
+
+class _FakeTicker:
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    @property
+    def info(self):
+        return {"shortName": f"{self.ticker} (simulé)", "currency": "EUR", "totalExpenseRatio": 0.002, "dividendYield": 0.01}
+
+def install_fake_yfinance():
+    """Remplace le module yfinance (pour ce processus uniquement)"""
+    module = types.ModuleType("yfinance")
+    module.download = fake_download
+    module.Ticker = _FakeTicker
+    sys.modules["yfinance"] = module
+    return module
+
+def fake_coingecko(path, params):
+    """Réponse simulée de /simple/price (et d'une /coins/list vide)"""
+    if path == "/coins/list":
+        return []
+    return {
+        coin_id: {"usd": 1.0 + zlib.crc32(coin_id.encode()) % 1000, "eur": 0.9, "usd_24h_change": 0.5}
+        for coin_id in params["ids"].split(",")
+    }
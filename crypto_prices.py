@@ -0,0 +1,123 @@
+import os
+import threading
+from concurrent.futures import Future
+
+import requests
+
+import market_cache
+import resilience
+from instrumentation import timed
+
+# Surchargeable pour pointer vers un serveur de test local
+COINGECKO_URL = os.environ.get("COINGECKO_URL", "https://api.coingecko.com/api/v3")
+
+# simple/price accepte de longues listes d'ids : on découpe seulement au-delà
+IDS_PER_REQUEST = 250
+COINS_LIST_TTL = 7 * 24 * 3600
+
+# Symboles courants : évite de télécharger la liste complète des coins
+KNOWN_IDS = {
+    "BTC": "bitcoin", "ETH": "ethereum", "SOL": "solana", "DOT": "polkadot", "ADA": "cardano",
+    "XRP": "ripple", "BNB": "binancecoin", "DOGE": "dogecoin", "AVAX": "avalanche-2",
+    "MATIC": "matic-network", "POL": "polygon-ecosystem-token", "LINK": "chainlink", "ATOM": "cosmos",
+    "LTC": "litecoin", "TRX": "tron", "NEAR": "near", "UNI": "uniswap", "XLM": "stellar",
+    "ALGO": "algorand", "USDT": "tether", "USDC": "usd-coin", "EGLD": "elrond-erd-2",
+}
+
+_session = requests.Session()
+_lock = threading.Lock()
+_inflight = {}
+
+def _request(path, params):
+    r = _session.get(f"{COINGECKO_URL}{path}", params=params, timeout=10)
+    if r.status_code == 429:
+        try:
+            wait = float(r.headers.get("Retry-After", ""))
+        except ValueError:
+            wait = None
+        raise resilience.Throttled("CoinGecko: trop de requêtes (429)", retry_after=wait)
+    r.raise_for_status()
+    return r.json()
+
+def _get(path, params=None):
+    """GET CoinGecko via le limiteur "coingecko" : débit, attente sur 429 (Retry-After), disjoncteur"""
+    return resilience.call("coingecko", lambda: _request(path, params))
+
+def _coalesced(key, fn):
+    """Les appelants simultanés d'une même requête partagent un seul appel réseau"""
+    with _lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight[key] = Future()
+    if not owner:
+        return future.result()
+    try:
+        result = fn()
+        future.set_result(result)
+        return result
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+
+def _fetch_coins_list():
+    return [{"id": c["id"], "symbol": c["symbol"].upper(), "name": c["name"]} for c in _get("/coins/list")]
+
+def resolve_ids(positions):
+    """Associe chaque symbole détenu à son id CoinGecko
+
+    Priorité : champ "coingecko_id" de la position, table KNOWN_IDS, puis la
+    liste complète des coins (mise en cache une semaine), en départageant les
+    symboles ambigus par le nom de la position.
+    """
+    ids, unknown = {}, []
+    for c in positions:
+        symbol = c["ticker"].upper()
+        if c.get("coingecko_id"):
+            ids[symbol] = c["coingecko_id"]
+        elif symbol in KNOWN_IDS:
+            ids[symbol] = KNOWN_IDS[symbol]
+        else:
+            unknown.append(c)
+    if unknown:
+        coins, _ = market_cache.get_or_fetch("coingecko:coins_list", COINS_LIST_TTL, _fetch_coins_list)
+        by_symbol = {}
+        for coin in coins or []:
+            by_symbol.setdefault(coin["symbol"], []).append(coin)
+        for c in unknown:
+            symbol = c["ticker"].upper()
+            matches = by_symbol.get(symbol, [])
+            named = [m for m in matches if m["name"].lower() == c.get("nom", "").lower()]
+            if named or matches:
+                ids[symbol] = (named or matches)[0]["id"]
+    return ids
+
+def fetch_simple_prices(coin_ids):
+    """Prix USD/EUR et variation 24h pour une liste d'ids, en un appel par tranche de 250"""
+    coin_ids = sorted(set(coin_ids))
+    result = {}
+    for i in range(0, len(coin_ids), IDS_PER_REQUEST):
+        chunk = coin_ids[i:i + IDS_PER_REQUEST]
+        params = {"ids": ",".join(chunk), "vs_currencies": "usd,eur", "include_24hr_change": "true"}
+        result.update(_coalesced(("simple/price", tuple(chunk)), lambda: _get("/simple/price", params)))
+    return result
+
+@timed("fetch.crypto")
+def get_crypto_prices(positions):
+    """Prix des cryptos détenues, indexés par symbole (None si CoinGecko est injoignable)"""
+    ids = resolve_ids(positions)
+    if not ids:
+        return {}
+    try:
+        raw = fetch_simple_prices(ids.values())
+    except Exception:
+        return None
+    prices = {}
+    for symbol, coin_id in ids.items():
+        d = raw.get(coin_id)
+        if d:
+            prices[symbol] = {"usd": d.get("usd", 0), "eur": d.get("eur", 0), "change": d.get("usd_24h_change", 0)}
+    return prices
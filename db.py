@@ -0,0 +1,34 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Une connexion par thread et par fichier : sqlite3 interdit le partage entre threads
+_local = threading.local()
+
+def get_connection(path, schema=None):
+    """Connexion SQLite du thread courant, en mode WAL (lectures concurrentes entre processus)"""
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    entry = conns.get(path)
+    if entry is None:
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        entry = conns[path] = {"conn": conn, "schemas": set()}
+    if schema and schema not in entry["schemas"]:
+        entry["conn"].executescript(schema)
+        entry["schemas"].add(schema)
+    return entry["conn"]
+
+@contextmanager
+def transaction(conn):
+    """Transaction d'écriture atomique (verrou pris dès le début pour éviter les interblocages)"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+
+import pandas as pd
+
+import history_store
+import ledger
+from market_data import download_closes
+from nav import FX_TICKER, FFILL_LOOKBACK_DAYS, crypto_ticker
+from instrumentation import timed
+
+# ============== EXÉCUTION DES DCA ==============
+
+# Clé de data : date du premier passage. Les échéances jusqu'à cette date sont
+# déjà comptées dans les quantités saisies à la main : elles ne sont pas rejouées.
+DEPUIS_KEY = "dca_depuis"
+
+def due_dates(order, today):
+    """Échéances passées d'un ordre (prochaine_execution incluse, jusqu'à today)"""
+    step = timedelta(days=max(int(order.get("frequence_jours") or 0), 1))
+    day = date.fromisoformat(order["prochaine_execution"])
+    dates = []
+    while day <= today:
+        dates.append(day)
+        day += step
+    return dates
+
+def _prices_at(closes, ticker, dates):
+    """Dernière clôture connue à chaque date (NaN si aucune)"""
+    if ticker not in closes.columns:
+        return pd.Series(float("nan"), index=dates)
+    return closes[ticker].dropna().asof(pd.DatetimeIndex(dates))
+
+def _next_after(order, day):
+    """Première échéance d'un ordre strictement après day"""
+    step = max(int(order.get("frequence_jours") or 0), 1)
+    first = date.fromisoformat(order["prochaine_execution"])
+    return first + timedelta(days=((day - first).days // step + 1) * step)
+
+@timed("dca.rattrapage")
+def execute_due(data, today=None, download=download_closes):
+    """Transforme les échéances DCA passées en achats du journal ; retourne le nombre d'achats
+
+    Appelé par le worker de cours (refresher), jamais pendant un rerun.
+    Toutes les échéances manquées depuis le dernier lancement sont valorisées
+    d'un coup, au cours de clôture du jour (converti EUR -> USD), à partir de
+    l'historique local : un seul téléchargement groupé, et seulement s'il manque
+    des séances. Une échéance sans cours connu attend le prochain passage.
+
+    Au premier passage, rien n'est rejoué : la date est retenue (DEPUIS_KEY) et
+    chaque ordre est avancé à sa première échéance postérieure.
+    """
+    today = today or date.today()
+    if not data.get(DEPUIS_KEY):
+        data[DEPUIS_KEY] = today.isoformat()
+    depuis = date.fromisoformat(data[DEPUIS_KEY])
+    for o in data["dca_orders"]:
+        if date.fromisoformat(o["prochaine_execution"]) <= depuis:
+            o["prochaine_execution"] = _next_after(o, depuis).isoformat()
+    dues = [(o, due_dates(o, today)) for o in data["dca_orders"]]
+    dues = [(o, dates) for o, dates in dues if dates]
+    if not dues:
+        return 0
+    start = min(dates[0] for _, dates in dues) - timedelta(days=FFILL_LOOKBACK_DAYS)
+    tickers = list(dict.fromkeys(crypto_ticker(o["crypto"]) for o, _ in dues)) + [FX_TICKER]
+    closes = history_store.get_closes_since(tickers, start.isoformat(), download)
+    if closes.empty:
+        return 0
+
+    fills = []
+    for o, dates in dues:
+        prix = _prices_at(closes, crypto_ticker(o["crypto"]), dates)
+        # EURUSD=X : dollars pour un euro
+        fx = _prices_at(closes, FX_TICKER, dates).fillna(1 / data.get("taux_usd_eur", 0.92))
+        executed = 0
+        for day, p, usd_par_eur in zip(dates, prix.tolist(), fx.tolist()):
+            if not p > 0:
+                break
+            fills.append({
+                "date": day.isoformat(), "classe": "crypto", "ticker": o["crypto"], "type": "achat",
+                "qty": o["montant_eur"] * usd_par_eur / p, "prix": p,
+                "source": f"dca:{o.get('id', o['crypto'])}:{day.isoformat()}",
+            })
+            executed += 1
+        if executed:
+            o["prochaine_execution"] = (dates[executed - 1] + timedelta(days=max(int(o.get("frequence_jours") or 0), 1))).isoformat()
+    return ledger.record_many(fills) if fills else 0
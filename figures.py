@@ -0,0 +1,114 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+import instrumentation
+import market_cache
+
+# ============== CACHE DES GRAPHIQUES ==============
+
+# JSON des figures Plotly déjà construites, sous une empreinte des données
+# d'entrée : un rerun dû à un widget sans rapport avec le graphique ne
+# reconstruit rien. Le JSON est partagé entre processus via market_cache, et
+# les FIGURE_CACHE_SIZE plus récents restent aussi en mémoire.
+FIGURE_CACHE_SIZE = 32
+FIGURE_PREFIX = "figure:"
+# Le contenu ne périme pas (la clé change avec les données) : le TTL sert
+# seulement à purger les figures plus demandées
+FIGURE_TTL = 86400
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+_stats = {"hits": 0, "shared": 0, "misses": 0}
+
+def _feed(h, value):
+    """Ajoute value à l'empreinte h (tableaux NumPy/pandas hachés par leurs octets)"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(type(value).__name__.encode())
+        _feed(h, value.index)
+        if isinstance(value, pd.DataFrame):
+            _feed(h, value.columns)
+        _feed(h, value.to_numpy())
+    elif isinstance(value, pd.Index):
+        _feed(h, value.asi8 if isinstance(value, pd.DatetimeIndex) else value.to_numpy())
+    elif isinstance(value, np.ndarray):
+        if value.dtype == object:
+            _feed(h, value.tolist())
+        else:
+            h.update(f"{value.dtype}{value.shape}".encode())
+            h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        h.update(b"{")
+        for k in sorted(value, key=repr):
+            _feed(h, k)
+            _feed(h, value[k])
+        h.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        h.update(b"[")
+        for v in value:
+            _feed(h, v)
+        h.update(b"]")
+    else:
+        h.update(repr(value).encode())
+        h.update(b";")
+
+def input_hash(inputs):
+    """Empreinte stable des entrées d'un graphique"""
+    h = hashlib.blake2b(digest_size=16)
+    _feed(h, inputs)
+    return h.hexdigest()
+
+def _from_json(text):
+    # Le JSON vient d'une figure déjà validée à sa construction : sans
+    # _validate=False, Plotly revaliderait chaque attribut (~25 ms par rendu)
+    return go.Figure(json.loads(text), _validate=False)
+
+def cached_figure(name, inputs, build):
+    """Figure de build(), reconstruite seulement si inputs a changé
+
+    inputs doit contenir tout ce que build() lit (données et libellés). Chaque
+    appel retourne une figure neuve, relue depuis le JSON en cache.
+    """
+    key = f"{FIGURE_PREFIX}{name}:{input_hash(inputs)}"
+    with _lock:
+        text = _cache.get(key)
+        if text is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+    if text is not None:
+        instrumentation.count("figures.hit")
+        return _from_json(text)
+    entry = market_cache.get_entry(key)
+    if entry and not entry["stale"]:
+        text = entry["value"]
+        instrumentation.count("figures.shared")
+        stat = "shared"
+    else:
+        with instrumentation.timed(f"figure.{name}"):
+            fig = build()
+            text = fig.to_json()
+        market_cache.put(key, text, FIGURE_TTL)
+        market_cache.purge(FIGURE_PREFIX, expired_only=True)
+        instrumentation.count("figures.miss")
+        stat = "misses"
+    with _lock:
+        _stats[stat] += 1
+        _cache[key] = text
+        _cache.move_to_end(key)
+        while len(_cache) > FIGURE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return _from_json(text)
+
+def cache_stats():
+    with _lock:
+        return dict(_stats, size=len(_cache))
+
+def clear():
+    with _lock:
+        _cache.clear()
+    market_cache.purge(FIGURE_PREFIX)
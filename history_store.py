@@ -0,0 +1,134 @@
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from db import get_connection
+
+# Historique journalier des clôtures, conservé d'une analyse à l'autre
+HISTORY_FILE = "price_history.db"
+
+# Au-delà de ce délai (secondes), on va chercher les dernières séances manquantes
+HISTORY_TTL = 3600
+
+PERIOD_DAYS = {"1mo": 31, "3mo": 92, "6mo": 183, "1y": 366, "2y": 731, "5y": 1827, "10y": 3653}
+
+# WITHOUT ROWID : les barres d'un ticker sont stockées contiguës, triées par date
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    close REAL NOT NULL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    ticker TEXT PRIMARY KEY,
+    covered_from TEXT NOT NULL,
+    last_date TEXT,
+    checked_at REAL NOT NULL
+);
+"""
+
+def _conn():
+    return get_connection(HISTORY_FILE, SCHEMA)
+
+def _placeholders(values):
+    return ",".join("?" * len(values))
+
+def period_start(period, today=None):
+    """Première date couverte par une période yfinance ("1y", "5y"...)"""
+    today = today or date.today()
+    return (today - timedelta(days=PERIOD_DAYS.get(period, 366))).isoformat()
+
+def get_coverage(tickers):
+    """Plage déjà téléchargée pour chaque ticker connu"""
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+    rows = _conn().execute(
+        f"SELECT ticker, covered_from, last_date, checked_at FROM coverage WHERE ticker IN ({_placeholders(tickers)})",
+        tickers,
+    ).fetchall()
+    return {t: {"covered_from": f, "last_date": l, "checked_at": c} for t, f, l, c in rows}
+
+def plan_downloads(tickers, start, coverage, now=None, ttl=HISTORY_TTL):
+    """Liste des téléchargements nécessaires : [(date de début, tickers, complet?)]
+
+    Un appel complet depuis start pour les tickers inconnus (ou à compléter
+    vers le passé), puis un appel par date de reprise pour la fin manquante des
+    autres : un ticker très en retard ne fait pas retélécharger ceux à jour.
+    """
+    now = now if now is not None else time.time()
+    full, tails = [], {}
+    for t in tickers:
+        cov = coverage.get(t)
+        if cov is None or cov["covered_from"] > start:
+            full.append(t)
+        elif now - cov["checked_at"] > ttl:
+            # On reprend la dernière séance connue : elle pouvait être incomplète
+            tails.setdefault(cov["last_date"] or start, []).append(t)
+    plan = []
+    if full:
+        plan.append((start, full, True))
+    plan.extend((tail_start, group, False) for tail_start, group in sorted(tails.items()))
+    return plan
+
+def store_bars(tickers, closes, covered_from=None):
+    """Enregistre les barres téléchargées et met à jour la couverture des tickers"""
+    conn = _conn()
+    now = time.time()
+    coverage = get_coverage(tickers)
+    rows, cov_rows = [], []
+    for t in tickers:
+        series = closes[t].dropna() if closes is not None and t in closes.columns else pd.Series(dtype=float)
+        rows.extend((t, d.strftime("%Y-%m-%d"), float(v)) for d, v in series.items())
+        old = coverage.get(t, {})
+        last = series.index[-1].strftime("%Y-%m-%d") if len(series) else None
+        first = min(filter(None, [covered_from, old.get("covered_from")]), default=covered_from)
+        cov_rows.append((t, first or last or date.today().isoformat(), max(filter(None, [last, old.get("last_date")]), default=None), now))
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO bars (ticker, date, close) VALUES (?, ?, ?)", rows)
+        conn.executemany("INSERT OR REPLACE INTO coverage (ticker, covered_from, last_date, checked_at) VALUES (?, ?, ?, ?)", cov_rows)
+
+def load_closes(tickers, start):
+    """Clôtures stockées depuis start, en DataFrame dates x tickers"""
+    tickers = list(tickers)
+    if not tickers:
+        return pd.DataFrame()
+    rows = _conn().execute(
+        f"SELECT ticker, date, close FROM bars WHERE ticker IN ({_placeholders(tickers)}) AND date >= ?",
+        tickers + [start],
+    ).fetchall()
+    if not rows:
+        return pd.DataFrame()
+    df = pd.DataFrame(rows, columns=["ticker", "date", "close"]).pivot(index="date", columns="ticker", values="close")
+    df.index = pd.to_datetime(df.index)
+    return df.sort_index().reindex(columns=[t for t in tickers if t in df.columns])
+
+def refresh(tickers, start, download, ttl=HISTORY_TTL):
+    """Télécharge seulement ce qui manque depuis start ; retourne la version des données
+
+    download(tickers, start) doit retourner un DataFrame dates x tickers. Un
+    ticker absent du résultat est noté comme vérifié (redemandé après ttl). La
+    version (dernière séance connue par ticker) change dès qu'une barre arrive.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    for dl_start, group, full in plan_downloads(tickers, start, get_coverage(tickers), ttl=ttl):
+        try:
+            closes = download(group, dl_start)
+        except Exception:
+            # Réseau indisponible : on sert ce qu'on a, la couverture reste à refaire
+            continue
+        store_bars(group, closes, covered_from=dl_start if full else None)
+    coverage = get_coverage(tickers)
+    return tuple((t, coverage.get(t, {}).get("last_date")) for t in tickers)
+
+def get_closes_since(tickers, start, download, ttl=HISTORY_TTL):
+    """Clôtures (dates x tickers) depuis start, servies depuis le disque ; seul le manquant est téléchargé"""
+    tickers = list(dict.fromkeys(tickers))
+    refresh(tickers, start, download, ttl)
+    return load_closes(tickers, start)
+
+def get_closes(tickers, period, download, ttl=HISTORY_TTL):
+    """Comme get_closes_since, pour une période yfinance ("1y", "5y"...)"""
+    return get_closes_since(tickers, period_start(period), download, ttl)
@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# ============== INSTRUMENTATION ==============
+
+# Sorties fichier, désactivées par défaut (aucune écriture disque par rerun) :
+# une ligne JSON par rerun, et un instantané au format texte Prometheus (à
+# exposer via le textfile collector de node_exporter)
+METRICS_LOG = os.environ.get("HORIZON_METRICS_LOG")
+PROM_FILE = os.environ.get("HORIZON_PROM_FILE")
+# Au-delà, le log passe en METRICS_LOG.1 (l'ancien .1 est écrasé)
+METRICS_LOG_MAX_BYTES = 5 * 1024 * 1024
+# Le fichier Prometheus n'est réécrit qu'une fois par intervalle de collecte (secondes)
+PROM_INTERVAL = 15.0
+
+_lock = threading.Lock()
+_prom_written = 0.0
+_totals = {}
+_counters = {}
+_local = threading.local()
+
+@contextmanager
+def timed(name):
+    """Chronomètre un bloc (with timed("x"):) ou une fonction (@timed("x"))
+
+    La durée s'ajoute aux totaux du processus, et à la trace du rerun en
+    cours si le bloc s'exécute dans le thread du script.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+def record(name, seconds):
+    with _lock:
+        t = _totals.setdefault(name, {"count": 0, "sum": 0.0, "max": 0.0})
+        t["count"] += 1
+        t["sum"] += seconds
+        t["max"] = max(t["max"], seconds)
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.append((name, seconds))
+
+def count(name, n=1):
+    """Compteur cumulé du processus (appels réseau par fournisseur...)
+
+    S'ajoute aussi aux compteurs du rerun en cours si l'appel vient du thread
+    du script.
+    """
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+    counts = getattr(_local, "counts", None)
+    if counts is not None:
+        counts[name] = counts.get(name, 0) + n
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+def begin_run():
+    """Début d'un rerun Streamlit : trace et compteurs du thread vides, compteurs du processus de référence"""
+    _local.trace = []
+    _local.counts = {}
+    _local.started = time.perf_counter()
+    _local.global_before = counters()
+
+def end_run(page):
+    """Fin du rerun : agrège la trace, l'écrit dans les sorties fichier activées, la retourne"""
+    trace = getattr(_local, "trace", None) or []
+    timings = {}
+    for name, seconds in trace:
+        timings[name] = timings.get(name, 0.0) + seconds
+    # Pendant le rerun, le worker de cours et les autres sessions ont pu compter
+    # eux aussi : seuls les compteurs du thread sont attribués à la page
+    before = getattr(_local, "global_before", {})
+    delta = {k: v - before.get(k, 0) for k, v in counters().items() if v != before.get(k, 0)}
+    run = {
+        "ts": time.time(),
+        "page": page,
+        "total": time.perf_counter() - getattr(_local, "started", time.perf_counter()),
+        "timings": timings,
+        "counters": getattr(_local, "counts", None) or {},
+        "counters_global": delta,
+    }
+    _local.trace = None
+    _local.counts = None
+    try:
+        if METRICS_LOG:
+            _append_log(run)
+        if PROM_FILE:
+            _maybe_write_prometheus()
+    except OSError:
+        # Disque en lecture seule : les métriques restent visibles dans l'app
+        pass
+    return run
+
+def _append_log(run):
+    with _lock:
+        if os.path.exists(METRICS_LOG) and os.path.getsize(METRICS_LOG) >= METRICS_LOG_MAX_BYTES:
+            os.replace(METRICS_LOG, METRICS_LOG + ".1")
+        with open(METRICS_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run, ensure_ascii=False) + "\n")
+
+def _maybe_write_prometheus():
+    global _prom_written
+    now = time.monotonic()
+    with _lock:
+        if now - _prom_written < PROM_INTERVAL:
+            return
+        _prom_written = now
+    write_prometheus()
+
+def totals():
+    with _lock:
+        return {name: dict(t) for name, t in _totals.items()}
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+def write_prometheus(path=None):
+    """Écrit les totaux au format texte Prometheus (remplacement atomique du fichier)"""
+    path = path or PROM_FILE
+    lines = [
+        "# HELP horizon_section_seconds Durée cumulée des sections instrumentées",
+        "# TYPE horizon_section_seconds summary",
+    ]
+    for name, t in sorted(totals().items()):
+        lines.append(f'horizon_section_seconds_sum{{section="{_label(name)}"}} {t["sum"]:.6f}')
+        lines.append(f'horizon_section_seconds_count{{section="{_label(name)}"}} {t["count"]}')
+    lines += ["# HELP horizon_section_seconds_max Durée maximale observée", "# TYPE horizon_section_seconds_max gauge"]
+    for name, t in sorted(totals().items()):
+        lines.append(f'horizon_section_seconds_max{{section="{_label(name)}"}} {t["max"]:.6f}')
+    lines += ["# HELP horizon_events_total Appels réseau, accès au cache...", "# TYPE horizon_events_total counter"]
+    for name, v in sorted(counters().items()):
+        lines.append(f'horizon_events_total{{event="{_label(name)}"}} {v}')
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp, path)
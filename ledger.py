@@ -0,0 +1,364 @@
+from datetime import date, timedelta
+
+from db import get_connection, transaction
+from storage import PORTFOLIO_FILE
+from instrumentation import timed
+
+# ============== JOURNAL DES TRANSACTIONS ==============
+
+# Types d'opération : qty x prix donne le montant (prix par unité, dans la devise
+# de la position : € pour la bourse, $ pour la crypto). Un dividende porte sur
+# qty actions à prix = dividende par action ; une récompense de staking entre
+# comme un lot au cours du jour de réception, compté aussi en revenu.
+TYPES = ("achat", "vente", "dividende", "staking")
+CLASSES = ("bourse", "crypto")
+# Champ du prix d'achat moyen dans les positions de data, par classe
+PRIX_ACHAT = {"bourse": "prix_achat", "crypto": "prix_achat_usd"}
+
+# Le journal est en ajout seul ; lots et positions en sont des agrégats mis à
+# jour à chaque opération, sans relire l'historique. source (unique quand
+# renseignée) rend un enregistrement idempotent : reprise, exécution DCA...
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    classe TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    type TEXT NOT NULL,
+    qty REAL NOT NULL,
+    prix REAL NOT NULL,
+    frais REAL NOT NULL DEFAULT 0,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS transactions_position ON transactions (classe, ticker, date, id);
+CREATE UNIQUE INDEX IF NOT EXISTS transactions_source ON transactions (source) WHERE source IS NOT NULL;
+CREATE TABLE IF NOT EXISTS lots (
+    id INTEGER PRIMARY KEY,
+    classe TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    qty REAL NOT NULL,
+    cout_unitaire REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lots_fifo ON lots (classe, ticker, date, id);
+CREATE TABLE IF NOT EXISTS positions (
+    classe TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    qty REAL NOT NULL,
+    cout REAL NOT NULL,
+    realise REAL NOT NULL,
+    revenus REAL NOT NULL,
+    frais REAL NOT NULL,
+    operations INTEGER NOT NULL,
+    derniere_date TEXT NOT NULL,
+    PRIMARY KEY (classe, ticker)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reprises (
+    classe TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    qty REAL NOT NULL,
+    prix REAL NOT NULL,
+    PRIMARY KEY (classe, ticker)
+) WITHOUT ROWID;
+"""
+
+# L'achat d'ouverture (source "reprise:...") est le seul enregistrement remplaçable :
+# reprises garde la quantité déclarée à la première synchronisation, et l'achat
+# d'ouverture n'en couvre que la part que l'historique saisi depuis n'explique pas.
+
+# Reste d'un lot en dessous duquel il est considéré comme soldé (arrondis)
+EPSILON = 1e-9
+
+def _conn():
+    return get_connection(PORTFOLIO_FILE, SCHEMA)
+
+def _position(conn, classe, ticker):
+    row = conn.execute(
+        "SELECT qty, cout, realise, revenus, frais, operations, derniere_date FROM positions WHERE classe = ? AND ticker = ?",
+        (classe, ticker),
+    ).fetchone()
+    if row is None:
+        return {"qty": 0.0, "cout": 0.0, "realise": 0.0, "revenus": 0.0, "frais": 0.0, "operations": 0, "derniere_date": ""}
+    return dict(zip(("qty", "cout", "realise", "revenus", "frais", "operations", "derniere_date"), row))
+
+def _consume_fifo(conn, classe, ticker, qty):
+    """Retire qty des lots les plus anciens ; retourne le coût de revient sorti"""
+    cout = 0.0
+    for lot_id, lot_qty, unitaire in conn.execute(
+        "SELECT id, qty, cout_unitaire FROM lots WHERE classe = ? AND ticker = ? ORDER BY date, id", (classe, ticker)
+    ).fetchall():
+        if qty <= EPSILON:
+            break
+        pris = min(qty, lot_qty)
+        cout += pris * unitaire
+        qty -= pris
+        if lot_qty - pris <= EPSILON:
+            conn.execute("DELETE FROM lots WHERE id = ?", (lot_id,))
+        else:
+            conn.execute("UPDATE lots SET qty = ? WHERE id = ?", (lot_qty - pris, lot_id))
+    if qty > EPSILON:
+        raise ValueError(f"{ticker}: vente supérieure à la quantité détenue")
+    return cout
+
+def _apply(conn, txn_id, day, classe, ticker, kind, qty, prix, frais, pos):
+    """Effet d'une opération sur les lots et la position (pos, modifiée sur place)"""
+    montant = qty * prix
+    if kind in ("achat", "staking"):
+        # Les frais d'achat entrent dans le coût de revient
+        cout = montant + (frais if kind == "achat" else 0.0)
+        conn.execute(
+            "INSERT INTO lots (id, classe, ticker, date, qty, cout_unitaire) VALUES (?, ?, ?, ?, ?, ?)",
+            (txn_id, classe, ticker, day, qty, cout / qty if qty else 0.0),
+        )
+        pos["qty"] += qty
+        pos["cout"] += cout
+        if kind == "staking":
+            pos["revenus"] += montant - frais
+    elif kind == "vente":
+        cout = _consume_fifo(conn, classe, ticker, qty)
+        pos["qty"] = max(pos["qty"] - qty, 0.0)
+        pos["cout"] = max(pos["cout"] - cout, 0.0)
+        pos["realise"] += montant - frais - cout
+    else:
+        pos["revenus"] += montant - frais
+    pos["frais"] += frais
+    pos["operations"] += 1
+    pos["derniere_date"] = max(pos["derniere_date"], day)
+
+def _save_position(conn, classe, ticker, pos):
+    conn.execute(
+        """INSERT INTO positions (classe, ticker, qty, cout, realise, revenus, frais, operations, derniere_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(classe, ticker) DO UPDATE SET qty = excluded.qty, cout = excluded.cout, realise = excluded.realise,
+        revenus = excluded.revenus, frais = excluded.frais, operations = excluded.operations, derniere_date = excluded.derniere_date""",
+        (classe, ticker, pos["qty"], pos["cout"], pos["realise"], pos["revenus"], pos["frais"], pos["operations"], pos["derniere_date"]),
+    )
+
+def _rebuild(conn, classe, ticker):
+    """Rejoue l'historique d'une seule position (opération antidatée)"""
+    conn.execute("DELETE FROM lots WHERE classe = ? AND ticker = ?", (classe, ticker))
+    pos = _position(conn, None, None)
+    rows = conn.execute(
+        "SELECT id, date, type, qty, prix, frais FROM transactions WHERE classe = ? AND ticker = ? ORDER BY date, id",
+        (classe, ticker),
+    ).fetchall()
+    for txn_id, day, kind, qty, prix, frais in rows:
+        _apply(conn, txn_id, day, classe, ticker, kind, qty, prix, frais, pos)
+    _save_position(conn, classe, ticker, pos)
+
+def _reprise_source(classe, ticker):
+    return f"reprise:{classe}:{ticker}"
+
+def _reprise(conn, classe, ticker):
+    """Quantité déclarée à la reprise (date, qty, prix), ou None si la position n'en a pas"""
+    row = conn.execute("SELECT date, qty, prix FROM reprises WHERE classe = ? AND ticker = ?", (classe, ticker)).fetchone()
+    if row is None:
+        # Première fois : l'achat d'ouverture d'origine porte la déclaration
+        row = conn.execute(
+            "SELECT date, qty, prix FROM transactions WHERE source = ?", (_reprise_source(classe, ticker),)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute("INSERT INTO reprises (classe, ticker, date, qty, prix) VALUES (?, ?, ?, ?, ?)", (classe, ticker) + tuple(row))
+    return row
+
+def _reconcile(conn, classe, ticker):
+    """Ajuste l'achat d'ouverture à l'historique saisi avant la date de reprise
+
+    La quantité détenue à la date de reprise reste celle déclarée : un achat
+    passé réduit l'ouverture (supprimée si l'historique explique tout), une
+    vente passée l'augmente. L'ouverture est datée de la veille de la plus
+    ancienne opération, pour que le FIFO la trouve avant les ventes passées.
+    """
+    reprise = _reprise(conn, classe, ticker)
+    if reprise is None:
+        return
+    day, declared, prix = reprise
+    source = _reprise_source(classe, ticker)
+    rows = conn.execute(
+        "SELECT date, type, qty FROM transactions WHERE classe = ? AND ticker = ? AND date < ? AND (source IS NULL OR source != ?)",
+        (classe, ticker, day, source),
+    ).fetchall()
+    net = sum(qty if kind in ("achat", "staking") else -qty if kind == "vente" else 0.0 for _, kind, qty in rows)
+    conn.execute("DELETE FROM transactions WHERE source = ?", (source,))
+    qty = declared - net
+    if qty > EPSILON:
+        debut = min([d for d, _, _ in rows], default=None)
+        debut = (date.fromisoformat(debut) - timedelta(days=1)).isoformat() if debut else day
+        conn.execute(
+            "INSERT INTO transactions (date, classe, ticker, type, qty, prix, frais, source) VALUES (?, ?, ?, 'achat', ?, ?, 0, ?)",
+            (debut, classe, ticker, qty, prix, source),
+        )
+
+def _check(classe, kind, qty, prix, frais):
+    if classe not in CLASSES:
+        raise ValueError(f"classe inconnue : {classe}")
+    if kind not in TYPES:
+        raise ValueError(f"type d'opération inconnu : {kind}")
+    if qty <= 0 or prix < 0 or frais < 0:
+        raise ValueError("quantité > 0, prix et frais >= 0 attendus")
+
+def _record(conn, t, stale):
+    """Ajoute une opération dans la transaction en cours ; False si sa source est déjà enregistrée
+
+    stale : positions à recalculer en fin de lot (opérations antidatées).
+    """
+    day, classe, ticker, kind = t["date"], t["classe"], t["ticker"].upper(), t["type"]
+    qty, prix, frais = float(t["qty"]), float(t["prix"]), float(t.get("frais", 0.0))
+    _check(classe, kind, qty, prix, frais)
+    cur = conn.execute(
+        "INSERT OR IGNORE INTO transactions (date, classe, ticker, type, qty, prix, frais, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (day, classe, ticker, kind, qty, prix, frais, t.get("source")),
+    )
+    if cur.rowcount == 0:
+        return False
+    if (classe, ticker) in stale:
+        return True
+    pos = _position(conn, classe, ticker)
+    if day < pos["derniere_date"]:
+        # Antidatée : l'ordre FIFO change, seule cette position est recalculée (une fois par lot)
+        stale.add((classe, ticker))
+    else:
+        _apply(conn, cur.lastrowid, day, classe, ticker, kind, qty, prix, frais, pos)
+        _save_position(conn, classe, ticker, pos)
+    return True
+
+def record(classe, ticker, kind, qty, prix, frais=0.0, day=None, source=None):
+    """Enregistre une opération et met à jour sa position ; False si source était déjà connue
+
+    Lève ValueError pour une vente supérieure à la quantité détenue (rien n'est écrit).
+    """
+    if isinstance(day, date):
+        day = day.isoformat()
+    return record_many([{
+        "date": day or date.today().isoformat(),
+        "classe": classe, "ticker": ticker, "type": kind, "qty": qty, "prix": prix, "frais": frais, "source": source,
+    }]) == 1
+
+@timed("journal.enregistrement")
+def record_many(transactions):
+    """Enregistre un lot d'opérations en une seule transaction ; retourne le nombre de nouvelles"""
+    conn = _conn()
+    stale = set()
+    with transaction(conn):
+        added = sum(_record(conn, t, stale) for t in transactions)
+        for classe, ticker in stale:
+            _reconcile(conn, classe, ticker)
+            _rebuild(conn, classe, ticker)
+    return added
+
+def close(classe, ticker, prix, qty=None):
+    """Solde une position (ou qty de celle-ci) par une vente au prix donné ; retourne la quantité vendue
+
+    Appelé quand une ligne est supprimée du portefeuille : sans cette vente, la
+    position du journal resterait ouverte et reviendrait au prochain achat.
+    """
+    p = positions().get((classe, ticker.upper()))
+    if p is None or p["qty"] <= EPSILON:
+        return 0.0
+    qty = min(qty, p["qty"]) if qty is not None else p["qty"]
+    record(classe, ticker, "vente", qty, prix)
+    return qty
+
+def remove(classe, ticker, qty=None):
+    """Retire une position saisie par erreur, sans vente : aucun P&L réalisé
+
+    Sans qty, la position quitte le journal avec toutes ses opérations. Avec
+    qty (le ticker reste sur d'autres lignes), seule la quantité déclarée à la
+    reprise diminue d'autant.
+    """
+    ticker = ticker.upper()
+    conn = _conn()
+    with transaction(conn):
+        if qty is None:
+            for table in ("transactions", "lots", "positions", "reprises"):
+                conn.execute(f"DELETE FROM {table} WHERE classe = ? AND ticker = ?", (classe, ticker))
+            return
+        if _reprise(conn, classe, ticker) is None:
+            return
+        conn.execute("UPDATE reprises SET qty = MAX(qty - ?, 0) WHERE classe = ? AND ticker = ?", (qty, classe, ticker))
+        _reconcile(conn, classe, ticker)
+        _rebuild(conn, classe, ticker)
+
+def positions():
+    """{(classe, ticker): qty, coût de revient restant, PRU, réalisé, revenus...}"""
+    result = {}
+    for classe, ticker, qty, cout, realise, revenus, frais, operations, derniere in _conn().execute(
+        "SELECT classe, ticker, qty, cout, realise, revenus, frais, operations, derniere_date FROM positions"
+    ):
+        result[(classe, ticker)] = {
+            "qty": qty, "cout": cout, "pru": cout / qty if qty > EPSILON else 0.0,
+            "realise": realise, "revenus": revenus, "frais": frais,
+            "operations": operations, "derniere_date": derniere,
+        }
+    return result
+
+def pnl(prix_actuels):
+    """Positions avec plus-value latente, d'après {(classe, ticker): prix actuel}"""
+    result = positions()
+    for key, p in result.items():
+        prix = prix_actuels.get(key)
+        p["valeur"] = p["qty"] * prix if prix is not None else None
+        p["latent"] = p["valeur"] - p["cout"] if prix is not None else None
+    return result
+
+def history(classe=None, ticker=None, limit=200):
+    """Dernières opérations (les plus récentes d'abord)"""
+    query, params = "SELECT id, date, classe, ticker, type, qty, prix, frais, source FROM transactions", []
+    if classe and ticker:
+        query += " WHERE classe = ? AND ticker = ?"
+        params = [classe, ticker.upper()]
+    rows = _conn().execute(query + " ORDER BY date DESC, id DESC LIMIT ?", params + [limit]).fetchall()
+    keys = ("id", "date", "classe", "ticker", "type", "qty", "prix", "frais", "source")
+    return [dict(zip(keys, row)) for row in rows]
+
+def _by_ticker(items):
+    """Positions de data regroupées par ticker"""
+    groups = {}
+    for item in items:
+        groups.setdefault(item["ticker"].upper(), []).append(item)
+    return groups
+
+def sync_portfolio(data):
+    """Relie data au journal : quantités et prix d'achat moyens viennent des positions
+
+    Une position sans historique est reprise telle quelle, par un achat
+    d'ouverture à son prix d'achat actuel. Un ticker présent sur plusieurs
+    lignes de data est repris en une seule position, mais ses lignes gardent
+    leurs valeurs saisies.
+    """
+    known = positions()
+    groups = {classe: _by_ticker(data.get(classe, [])) for classe in CLASSES}
+    reprises = []
+    for classe, by_ticker in groups.items():
+        champ = PRIX_ACHAT[classe]
+        for ticker, items in by_ticker.items():
+            qty = sum(item.get("qty", 0) for item in items)
+            if (classe, ticker) in known or qty <= 0:
+                continue
+            cout = sum(item.get("qty", 0) * item.get(champ, 0) for item in items)
+            reprises.append({
+                "date": date.today().isoformat(), "classe": classe, "ticker": ticker, "type": "achat",
+                "qty": qty, "prix": cout / qty, "source": _reprise_source(classe, ticker),
+            })
+    if reprises:
+        record_many(reprises)
+        known = positions()
+    for classe, by_ticker in groups.items():
+        for ticker, items in by_ticker.items():
+            p = known.get((classe, ticker))
+            if p is None or len(items) > 1:
+                continue
+            items[0]["qty"] = p["qty"]
+            items[0][PRIX_ACHAT[classe]] = p["pru"]
+    return data
+
+def reset():
+    """Efface le journal et ses agrégats"""
+    conn = _conn()
+    with transaction(conn):
+        conn.execute("DELETE FROM transactions")
+        conn.execute("DELETE FROM lots")
+        conn.execute("DELETE FROM positions")
+        conn.execute("DELETE FROM reprises")
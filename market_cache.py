@@ -0,0 +1,127 @@
+import json
+import threading
+import time
+
+import instrumentation
+from db import get_connection
+
+# Cache partagé entre sessions Streamlit et processus (worker, plusieurs onglets...)
+CACHE_FILE = "market_cache.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    ttl REAL NOT NULL
+);
+"""
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "fetches": 0, "errors": 0, "stale_served": 0}
+_key_locks = {}
+
+def _conn():
+    return get_connection(CACHE_FILE, SCHEMA)
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+    instrumentation.count(f"cache.{name}")
+
+def _key_lock(key):
+    with _stats_lock:
+        return _key_locks.setdefault(key, threading.Lock())
+
+def get_entry(key, ttl=None):
+    """Entrée du cache avec ses métadonnées d'âge, ou None si absente"""
+    row = _conn().execute("SELECT value, fetched_at, ttl FROM cache WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None
+    value, fetched_at, stored_ttl = row
+    age = time.time() - fetched_at
+    return {
+        "value": json.loads(value),
+        "fetched_at": fetched_at,
+        "age": age,
+        "stale": age > (ttl if ttl is not None else stored_ttl),
+    }
+
+def get_entries(keys, ttl=None):
+    """Plusieurs entrées en une seule requête : {clé: entrée} pour les clés présentes"""
+    keys = list(keys)
+    if not keys:
+        return {}
+    rows = _conn().execute(
+        f"SELECT key, value, fetched_at, ttl FROM cache WHERE key IN ({','.join('?' * len(keys))})", keys
+    ).fetchall()
+    now = time.time()
+    return {
+        key: {
+            "value": json.loads(value),
+            "fetched_at": fetched_at,
+            "age": now - fetched_at,
+            "stale": now - fetched_at > (ttl if ttl is not None else stored_ttl),
+        }
+        for key, value, fetched_at, stored_ttl in rows
+    }
+
+def put(key, value, ttl):
+    """Enregistre une valeur (sérialisable JSON) avec son TTL"""
+    conn = _conn()
+    with conn:
+        conn.execute(
+            "INSERT INTO cache (key, value, fetched_at, ttl) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, fetched_at = excluded.fetched_at, ttl = excluded.ttl",
+            (key, json.dumps(value), time.time(), ttl),
+        )
+
+def purge(prefix, expired_only=False):
+    """Supprime les entrées dont la clé commence par prefix (seulement les expirées si demandé)"""
+    sql = "DELETE FROM cache WHERE substr(key, 1, ?) = ?"
+    params = [len(prefix), prefix]
+    if expired_only:
+        sql += " AND fetched_at + ttl < ?"
+        params.append(time.time())
+    conn = _conn()
+    with conn:
+        return conn.execute(sql, params).rowcount
+
+def get_or_fetch(key, ttl, fetch):
+    """Retourne (valeur, métadonnées) depuis le cache, ou appelle fetch() si périmé
+
+    fetch() doit retourner None en cas d'échec : on sert alors la dernière
+    valeur connue (marquée stale) plutôt que rien.
+    """
+    entry = get_entry(key, ttl)
+    if entry and not entry["stale"]:
+        _count("hits")
+        return entry["value"], entry
+    # Un seul appel réseau par clé, même si plusieurs sessions arrivent ensemble
+    with _key_lock(key):
+        entry = get_entry(key, ttl)
+        if entry and not entry["stale"]:
+            _count("hits")
+            return entry["value"], entry
+        _count("misses")
+        _count("fetches")
+        try:
+            value = fetch()
+        except Exception:
+            value = None
+        if value is None:
+            _count("errors")
+            if entry:
+                _count("stale_served")
+                return entry["value"], entry
+            return None, None
+        put(key, value, ttl)
+        return value, {"value": value, "fetched_at": time.time(), "age": 0, "stale": False}
+
+def cache_stats():
+    """Compteurs du processus courant, pour le suivi (sidebar, logs)"""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0
+    return stats
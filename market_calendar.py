@@ -0,0 +1,163 @@
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+# ============== CALENDRIERS DE MARCHÉ ==============
+
+# Séance continue de chaque place, dans son fuseau ; "feries" désigne les règles ci-dessous
+EXCHANGES = {
+    "NYSE": {"nom": "New York", "tz": "America/New_York", "open": time(9, 30), "close": time(16, 0), "feries": "us"},
+    "XPAR": {"nom": "Euronext Paris", "tz": "Europe/Paris", "open": time(9, 0), "close": time(17, 30), "feries": "euronext"},
+    "XAMS": {"nom": "Euronext Amsterdam", "tz": "Europe/Amsterdam", "open": time(9, 0), "close": time(17, 30), "feries": "euronext"},
+    "XLON": {"nom": "Londres", "tz": "Europe/London", "open": time(8, 0), "close": time(16, 30), "feries": "uk"},
+    "XETR": {"nom": "Xetra", "tz": "Europe/Berlin", "open": time(9, 0), "close": time(17, 30), "feries": "de"},
+    "XSWX": {"nom": "SIX Zurich", "tz": "Europe/Zurich", "open": time(9, 0), "close": time(17, 30), "feries": "ch"},
+    "XCSE": {"nom": "Copenhague", "tz": "Europe/Copenhagen", "open": time(9, 0), "close": time(17, 0), "feries": "dk"},
+}
+
+# Suffixe Yahoo -> place ; sans suffixe, c'est une valeur américaine
+SUFFIXES = {".PA": "XPAR", ".AS": "XAMS", ".L": "XLON", ".DE": "XETR", ".SW": "XSWX", ".CO": "XCSE"}
+DEFAULT_EXCHANGE = "NYSE"
+# Cotations en continu : crypto 24h/24 7j/7, change 24h/24 en semaine
+ALWAYS_OPEN = "24/7"
+FOREX = "24/5"
+# Yahoo publie la clôture définitive quelques minutes après la fin de séance
+CLOSE_DELAY = timedelta(minutes=15)
+
+def exchange_for(ticker):
+    """Place de cotation d'un ticker Yahoo, d'après son suffixe"""
+    ticker = ticker.upper()
+    if ticker.endswith("-USD") or ticker.endswith("-EUR"):
+        return ALWAYS_OPEN
+    if ticker.endswith("=X"):
+        return FOREX
+    if "." in ticker:
+        return SUFFIXES.get(ticker[ticker.rindex("."):], DEFAULT_EXCHANGE)
+    return DEFAULT_EXCHANGE
+
+# ============== JOURS FÉRIÉS ==============
+
+def _easter(year):
+    """Dimanche de Pâques (algorithme grégorien anonyme)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    return date(year, month, (h + l - 7 * m + 33 * month + 19) % 32)
+
+def _nth_weekday(year, month, weekday, n):
+    """n-ième jour de semaine du mois (n = -1 : le dernier)"""
+    if n > 0:
+        d = date(year, month, 1)
+        return d + timedelta(days=(weekday - d.weekday()) % 7 + 7 * (n - 1))
+    d = date(year, month + 1, 1) - timedelta(days=1) if month < 12 else date(year, 12, 31)
+    return d - timedelta(days=(d.weekday() - weekday) % 7)
+
+def _us_observed(d):
+    """Férié US tombant le week-end : chômé le vendredi ou le lundi"""
+    return d - timedelta(days=1) if d.weekday() == 5 else d + timedelta(days=1) if d.weekday() == 6 else d
+
+def _uk_substitutes(days):
+    """Férié UK tombant le week-end : reporté au(x) jour(s) ouvré(s) suivant(s)"""
+    result = set()
+    for d in sorted(days):
+        while d.weekday() >= 5 or d in result:
+            d += timedelta(days=1)
+        result.add(d)
+    return result
+
+@lru_cache(maxsize=None)
+def holidays(rules, year):
+    """Jours de fermeture (hors week-ends) d'un jeu de règles pour une année"""
+    paques = _easter(year)
+    vendredi_saint, lundi_paques = paques - timedelta(days=2), paques + timedelta(days=1)
+    if rules == "us":
+        # Jour de l'an un samedi : pas de report au vendredi (ce serait l'année précédente)
+        nouvel_an = date(year, 1, 1) if date(year, 1, 1).weekday() == 5 else _us_observed(date(year, 1, 1))
+        days = {nouvel_an, _nth_weekday(year, 1, 0, 3), _nth_weekday(year, 2, 0, 3), vendredi_saint,
+                _nth_weekday(year, 5, 0, -1), _us_observed(date(year, 6, 19)), _us_observed(date(year, 7, 4)),
+                _nth_weekday(year, 9, 0, 1), _nth_weekday(year, 11, 3, 4), _us_observed(date(year, 12, 25))}
+    elif rules == "euronext":
+        days = {date(year, 1, 1), vendredi_saint, lundi_paques, date(year, 5, 1), date(year, 12, 25), date(year, 12, 26)}
+    elif rules == "uk":
+        days = _uk_substitutes([date(year, 1, 1), date(year, 12, 25), date(year, 12, 26)]) | {
+            vendredi_saint, lundi_paques, _nth_weekday(year, 5, 0, 1), _nth_weekday(year, 5, 0, -1), _nth_weekday(year, 8, 0, -1)}
+    elif rules == "de":
+        days = {date(year, 1, 1), vendredi_saint, lundi_paques, date(year, 5, 1),
+                date(year, 12, 24), date(year, 12, 25), date(year, 12, 26), date(year, 12, 31)}
+    elif rules == "ch":
+        days = {date(year, 1, 1), date(year, 1, 2), vendredi_saint, lundi_paques, date(year, 5, 1),
+                paques + timedelta(days=39), paques + timedelta(days=50), date(year, 8, 1),
+                date(year, 12, 24), date(year, 12, 25), date(year, 12, 26), date(year, 12, 31)}
+    elif rules == "dk":
+        days = {date(year, 1, 1), paques - timedelta(days=3), vendredi_saint, lundi_paques,
+                paques + timedelta(days=39), paques + timedelta(days=40), paques + timedelta(days=50),
+                date(year, 6, 5), date(year, 12, 24), date(year, 12, 25), date(year, 12, 26), date(year, 12, 31)}
+    else:
+        days = set()
+    return frozenset(d for d in days if d.weekday() < 5)
+
+# ============== SÉANCES ==============
+
+def _now(now=None):
+    return now.astimezone() if now is not None else datetime.now().astimezone()
+
+def is_trading_day(exchange, day):
+    if exchange == ALWAYS_OPEN:
+        return True
+    if exchange == FOREX:
+        return day.weekday() < 5
+    return day.weekday() < 5 and day not in holidays(EXCHANGES[exchange]["feries"], day.year)
+
+def is_open(exchange, now=None):
+    """La place est-elle en séance à cet instant (heure locale de la place)"""
+    if exchange in (ALWAYS_OPEN, FOREX):
+        return is_trading_day(exchange, _now(now).date())
+    ex = EXCHANGES[exchange]
+    local = _now(now).astimezone(ZoneInfo(ex["tz"]))
+    return is_trading_day(exchange, local.date()) and ex["open"] <= local.time() < ex["close"]
+
+def last_close(exchange, now=None):
+    """Fin de la dernière séance terminée (datetime avec fuseau), None pour un marché continu"""
+    if exchange in (ALWAYS_OPEN, FOREX):
+        return None
+    ex = EXCHANGES[exchange]
+    tz = ZoneInfo(ex["tz"])
+    local = _now(now).astimezone(tz)
+    day = local.date()
+    # Un week-end de Pâques avec lundi férié reste sous les 10 jours
+    for _ in range(10):
+        close = datetime.combine(day, ex["close"], tzinfo=tz)
+        if close <= local and is_trading_day(exchange, day):
+            return close
+        day -= timedelta(days=1)
+    return None
+
+def needs_refresh(ticker, last_check, interval, now=None):
+    """Faut-il recoter ce ticker : en séance toutes les `interval` secondes,
+    puis une dernière fois une fois la clôture publiée, puis plus rien
+    jusqu'à la réouverture
+
+    last_check : ISO (heure locale) de la dernière tentative, ou None.
+    """
+    if not last_check:
+        return True
+    now = _now(now)
+    try:
+        last = datetime.fromisoformat(last_check).astimezone()
+    except ValueError:
+        return True
+    exchange = exchange_for(ticker)
+    close = last_close(exchange, now)
+    if is_open(exchange, now) or (close is not None and now < close + CLOSE_DELAY):
+        return (now - last).total_seconds() > interval
+    return close is not None and last < close + CLOSE_DELAY
+
+def market_status(tickers, now=None):
+    """{place: ouverte ?} pour les places des tickers donnés (marchés continus exclus)"""
+    places = dict.fromkeys(exchange_for(t) for t in tickers)
+    return {EXCHANGES[p]["nom"]: is_open(p, now) for p in places if p in EXCHANGES}
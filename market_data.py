@@ -0,0 +1,313 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import history_store
+import market_cache
+import metadata
+import resilience
+from instrumentation import timed
+
+# Taille max d'un lot yfinance (au-delà, l'URL et la réponse deviennent énormes)
+STOCK_BATCH_SIZE = 100
+
+# Délai max (secondes) accordé à chaque source lors d'une mise à jour groupée
+SOURCE_TIMEOUTS = {"yahoo": 40, "crypto": 15}
+DEFAULT_SOURCE_TIMEOUT = 20
+
+# Durée de validité du taux EUR/USD en cache (secondes)
+FOREX_TTL = 300
+
+# yf.download n'est pas sûr entre threads (résultats partagés dans des globales
+# de yfinance) : tous les téléchargements Yahoo du processus passent un par un
+YAHOO_LOCK = threading.Lock()
+
+# Screener : premier lot court pour afficher vite un résultat, puis lots yfinance pleins
+SCREENER_FIRST_CHUNK = 10
+
+# ============== FONCTIONS DE PRIX ==============
+
+def _download(batch, **kwargs):
+    """yf.download d'un lot via le limiteur "yahoo" ; lève resilience.NoData si rien n'est revenu
+
+    Un lot vide est le plus souvent un ticker mal saisi ou sans cotation : il
+    ne compte pas comme une panne de Yahoo pour le disjoncteur.
+    """
+    import yfinance as yf
+    def fetch():
+        with YAHOO_LOCK:
+            raw = yf.download(batch, interval="1d", progress=False, auto_adjust=True, group_by="column", threads=True, **kwargs)
+        closes = split_closes(raw, batch)
+        if closes.dropna(how="all").empty:
+            raise resilience.NoData(f"yfinance: aucune donnée pour {', '.join(batch[:3])}{'…' if len(batch) > 3 else ''}")
+        return closes
+    return resilience.call("yahoo", fetch)
+
+def split_closes(raw, tickers):
+    """Extrait un DataFrame de clôtures (dates x tickers) d'un yf.download groupé"""
+    if raw is None or raw.empty:
+        return pd.DataFrame()
+    if isinstance(raw.columns, pd.MultiIndex):
+        # group_by="column" => niveau 0 = champ (Close, Open...), niveau 1 = ticker
+        if "Close" not in raw.columns.get_level_values(0):
+            return pd.DataFrame()
+        closes = raw["Close"]
+    else:
+        # Ancien format yfinance pour un ticker unique
+        if "Close" not in raw.columns:
+            return pd.DataFrame()
+        closes = raw[["Close"]]
+        closes.columns = [tickers[0]]
+    return closes.apply(pd.to_numeric, errors="coerce")
+
+def quotes_from_closes(closes):
+    """Dernier cours et variation vs la séance précédente, pour chaque colonne"""
+    prices = {}
+    for ticker in closes.columns:
+        # Chaque place a son calendrier : on ne garde que les séances cotées du ticker
+        close_prices = closes[ticker].dropna()
+        if len(close_prices) < 1:
+            continue
+        price = float(close_prices.iloc[-1])
+        if len(close_prices) > 1:
+            prev = float(close_prices.iloc[-2])
+            change = ((price - prev) / prev) * 100 if prev > 0 else 0
+        else:
+            change = 0
+        prices[ticker] = {"price": price, "change": change}
+    return prices
+
+@timed("fetch.actions")
+def get_stock_prices(tickers, batch_size=STOCK_BATCH_SIZE):
+    """Récupère les prix des actions par lots (un seul appel yfinance par lot)
+
+    Les tickers en erreur sont simplement absents du résultat : l'appelant
+    compare avec sa liste pour signaler ceux qui manquent.
+    """
+    prices = {}
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    if not tickers:
+        return prices
+    for i in range(0, len(tickers), batch_size):
+        batch = tickers[i:i + batch_size]
+        try:
+            closes = _download(batch, period="5d")
+        except resilience.CircuitOpen:
+            # Yahoo indisponible : inutile d'essayer les lots suivants
+            break
+        except Exception:
+            # Lot entier en échec : on continue avec les suivants
+            continue
+        prices.update(quotes_from_closes(closes))
+    return prices
+
+@timed("fetch.forex")
+def fetch_forex_rate():
+    """Télécharge le taux EUR/USD (None en cas d'échec)"""
+    try:
+        import yfinance as yf
+        def fetch():
+            with YAHOO_LOCK:
+                return yf.download("EURUSD=X", period="1d", interval="1d", progress=False)
+        fx = resilience.call("yahoo", fetch)
+        if not fx.empty:
+            # Gérer MultiIndex
+            if isinstance(fx.columns, pd.MultiIndex):
+                fx.columns = fx.columns.get_level_values(0)
+            if 'Close' in fx.columns:
+                return 1 / float(fx['Close'].iloc[-1])
+    except:
+        pass
+    return None
+
+def get_forex_rate():
+    """Récupère le taux EUR/USD via le cache partagé (un seul téléchargement par TTL)"""
+    rate, _ = market_cache.get_or_fetch("fx:EURUSD", FOREX_TTL, fetch_forex_rate)
+    return rate if rate else 0.92
+
+@timed("fetch.historique")
+def download_closes(tickers, start):
+    """Télécharge les clôtures journalières depuis start, par lots (DataFrame vide si aucune)"""
+    tickers = list(tickers)
+    frames, error = [], None
+    for i in range(0, len(tickers), STOCK_BATCH_SIZE):
+        batch = tickers[i:i + STOCK_BATCH_SIZE]
+        try:
+            frames.append(_download(batch, start=start))
+        except resilience.NoData:
+            # Aucune séance pour ce lot : un résultat vide, que history_store note comme vérifié
+            continue
+        except resilience.CircuitOpen:
+            raise
+        except Exception as e:
+            # Un lot vide ne doit pas faire perdre les autres
+            error = e
+    if not frames and error is not None:
+        raise error
+    return pd.concat(frames, axis=1) if frames else pd.DataFrame()
+
+def aligned_closes(closes):
+    """Matrice de clôtures alignée : union des calendriers, cours propagés
+
+    La matrice démarre à la première cotation, tous tickers confondus : un
+    titre coté plus tard reste NaN jusqu'à sa première clôture, sans tronquer
+    l'historique des autres. Les tickers sans deux clôtures sont écartés.
+    """
+    closes = closes.loc[:, closes.notna().sum() > 1].sort_index().ffill()
+    return closes.loc[closes.notna().any(axis=1)]
+
+@timed("comparateur")
+def get_etf_comparison_data(tickers, period="1y"):
+    """Compare des ETF/actions sur une matrice dates x tickers alignée
+
+    Retourne None si rien n'est exploitable, sinon :
+    dates, tickers (classés par performance), base100 (matrice T x N dans
+    l'ordre de tickers, NaN avant la première clôture d'un ticker), perf,
+    correlation (rendements journaliers, sur les séances communes à chaque
+    paire) et infos (métadonnées par ticker, dont sa date de départ).
+    """
+    # Historique servi depuis le disque : seules les séances manquantes sont téléchargées
+    closes = history_store.get_closes(tickers, period, download_closes)
+    closes = aligned_closes(closes)
+    if len(closes) < 2:
+        return None
+    # Première clôture de chaque ticker : chacun est rebasé à 100 à sa propre date de départ
+    premier = closes.bfill().to_numpy(dtype=float)[0]
+    valides = premier > 0
+    if not valides.any():
+        return None
+    closes, premier = closes.loc[:, valides], premier[valides]
+    prix = closes.to_numpy(dtype=float)
+    debuts = closes.notna().idxmax()
+
+    # Base 100, performance et classement en une passe sur la matrice
+    base100 = prix / premier * 100
+    perf = base100[-1] - 100
+    ordre = np.argsort(-perf, kind="stable")
+    base100, perf = base100[:, ordre], perf[ordre]
+    classes = closes.columns[ordre].tolist()
+    # Corrélations par paire, sur les séances où les deux titres cotaient
+    correlation = closes[classes].pct_change(fill_method=None).corr(min_periods=2)
+
+    # Métadonnées (.info) lues en cache, rafraîchies en arrière-plan
+    meta = metadata.get_metadata(classes)
+    infos = {}
+    for i, ticker in enumerate(classes):
+        infos[ticker] = {
+            "perf": float(perf[i]),
+            "name": meta[ticker]["name"],
+            "expense_ratio": meta[ticker]["expense_ratio"],
+            "dividend_yield": meta[ticker]["dividend_yield"],
+            "current_price": float(prix[-1, ordre[i]]),
+            "currency": meta[ticker]["currency"],
+            "meta_pending": meta[ticker]["pending"],
+            "debut": debuts[ticker].strftime("%Y-%m-%d"),
+        }
+    return {
+        "dates": [d.strftime("%Y-%m-%d") for d in closes.index],
+        "tickers": classes,
+        "base100": base100,
+        "perf": perf,
+        "correlation": correlation,
+        "infos": infos,
+    }
+
+# ============== SCREENER ==============
+
+def parse_universe(text):
+    """Tickers d'un fichier univers : liste libre (virgules, points-virgules, espaces, lignes)
+    ou CSV avec en-tête, dont seule la première colonne est lue"""
+    lines = [l for l in text.splitlines() if l.strip()]
+    if lines and re.match(r"\s*\"?(ticker|symbol|symbole)\b", lines[0], re.IGNORECASE):
+        tokens = [re.split(r"[,;\t]", l)[0] for l in lines[1:]]
+    else:
+        tokens = re.split(r"[,;\s]+", text)
+    tickers = [t.strip().strip('"').upper() for t in tokens]
+    return list(dict.fromkeys(t for t in tickers if t))
+
+def screen_stats(closes):
+    """Performance, volatilité annualisée et drawdown max de chaque colonne (en %)"""
+    if closes.empty:
+        return pd.DataFrame(columns=["perf", "volatilite", "max_drawdown", "prix", "seances"])
+    prix = closes.ffill().to_numpy(dtype=float)
+    premier = closes.bfill().to_numpy(dtype=float)[0]
+    dernier = prix[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rendements = prix[1:] / prix[:-1] - 1
+        plus_haut = np.fmax.accumulate(prix, axis=0)
+        stats = pd.DataFrame({
+            "perf": (dernier / premier - 1) * 100,
+            "volatilite": np.nanstd(rendements, axis=0, ddof=1) * np.sqrt(252) * 100,
+            "max_drawdown": np.nanmin(prix / plus_haut - 1, axis=0) * 100,
+            "prix": dernier,
+            "seances": closes.notna().sum().to_numpy(),
+        }, index=closes.columns)
+    return stats[stats["seances"] > 1]
+
+def screen(tickers, period="1y", chunk_size=STOCK_BATCH_SIZE):
+    """Screener en flux : génère (tickers traités, DataFrame de statistiques) par lot terminé
+
+    Les tickers déjà à jour sur disque sortent en premier, sans réseau. Les
+    autres sont téléchargés par lots (le premier volontairement court) ; les
+    appels yfinance restent séquentiels, et attendent YAHOO_LOCK si le worker
+    de cours télécharge au même moment. Les tickers sans données sont
+    simplement absents.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    start = history_store.period_start(period)
+    plan = history_store.plan_downloads(tickers, start, history_store.get_coverage(tickers))
+    a_telecharger = list(dict.fromkeys(t for _, group, _ in plan for t in group))
+    prets = [t for t in tickers if t not in set(a_telecharger)]
+    if prets:
+        yield len(prets), screen_stats(history_store.load_closes(prets, start))
+    lots, i = [], 0
+    while i < len(a_telecharger):
+        taille = SCREENER_FIRST_CHUNK if not lots and not prets else chunk_size
+        lots.append(a_telecharger[i:i + taille])
+        i += taille
+    for lot in lots:
+        yield len(lot), screen_stats(history_store.get_closes_since(lot, start, download_closes))
+
+def get_monthly_returns(ticker, period="10y"):
+    """Rendements mensuels historiques d'un ticker (historique servi par history_store)"""
+    try:
+        closes = history_store.get_closes([ticker], period, download_closes)
+    except ImportError:
+        return None
+    if ticker not in closes.columns:
+        return None
+    mensuels = closes[ticker].dropna().resample("ME").last()
+    return mensuels.pct_change().dropna().to_numpy()
+
+# ============== RÉCUPÉRATION CONCURRENTE ==============
+
+def fetch_concurrently(jobs, timeouts=None):
+    """Lance toutes les sources en parallèle et attend au plus leur délai respectif
+
+    jobs: {nom: fonction sans argument}. Retourne (résultats, erreurs) ; une
+    source en échec ou hors délai est absente des résultats et présente dans
+    les erreurs, sans bloquer les autres.
+    """
+    timeouts = timeouts if timeouts is not None else SOURCE_TIMEOUTS
+    results, errors = {}, {}
+    if not jobs:
+        return results, errors
+    pool = ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="fetch")
+    try:
+        start = time.monotonic()
+        futures = {name: pool.submit(fn) for name, fn in jobs.items()}
+        for name, future in futures.items():
+            # Les délais courent tous depuis le lancement commun
+            remaining = timeouts.get(name, DEFAULT_SOURCE_TIMEOUT) - (time.monotonic() - start)
+            try:
+                results[name] = future.result(timeout=max(0, remaining))
+            except Exception as e:
+                errors[name] = e
+    finally:
+        # Ne pas attendre une source bloquée : son thread finira seul
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results, errors
@@ -0,0 +1,112 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import market_cache
+import resilience
+
+# Nom, TER, rendement, devise : ça ne bouge qu'à chaque rapport trimestriel
+METADATA_TTL = 7 * 24 * 3600
+# Échec (ticker inconnu, Yahoo injoignable) : noté pour ce délai, sans nouvel
+# appel .info à chaque rerun
+METADATA_FAILURE_TTL = 3600
+METADATA_WORKERS = 8
+
+_lock = threading.Lock()
+_pending = set()
+_worker = None
+
+def _key(ticker):
+    return f"meta:{ticker}"
+
+def default_metadata(ticker):
+    return {"name": ticker, "expense_ratio": 0, "dividend_yield": 0, "currency": "USD"}
+
+def parse_info(ticker, info):
+    """Extrait les champs utiles d'un yf.Ticker(...).info"""
+    name = info.get("shortName") or info.get("longName") or ticker
+    expense_ratio = info.get("annualReportExpenseRatio") or info.get("totalExpenseRatio") or 0
+    div_yield = info.get("dividendYield") or info.get("yield") or 0
+    # Limiter les valeurs aberrantes
+    if expense_ratio and expense_ratio > 0.1:  # Max 10%
+        expense_ratio = 0
+    if div_yield and div_yield > 0.2:  # Max 20%
+        div_yield = 0
+    return {
+        "name": name[:30] if name else ticker,
+        "expense_ratio": expense_ratio or 0,
+        "dividend_yield": div_yield or 0,
+        "currency": info.get("currency", "USD"),
+    }
+
+def fetch_metadata(ticker):
+    """Appel lent à yfinance (.info) pour un ticker, None en cas d'échec"""
+    try:
+        import yfinance as yf
+        return parse_info(ticker, resilience.call("yahoo", lambda: yf.Ticker(ticker).info))
+    except Exception:
+        return None
+
+def refresh_metadata(tickers):
+    """Télécharge et enregistre les métadonnées d'un lot de tickers en parallèle
+
+    Un échec est enregistré lui aussi, pour METADATA_FAILURE_TTL : la
+    dernière valeur connue s'il y en a une, sinon les valeurs par défaut.
+    """
+    tickers = list(tickers)
+    with ThreadPoolExecutor(max_workers=METADATA_WORKERS, thread_name_prefix="meta") as pool:
+        metas = list(pool.map(fetch_metadata, tickers))
+    failed = [t for t, meta in zip(tickers, metas) if not meta]
+    known = market_cache.get_entries([_key(t) for t in failed])
+    for ticker, meta in zip(tickers, metas):
+        if meta:
+            market_cache.put(_key(ticker), meta, METADATA_TTL)
+        else:
+            entry = known.get(_key(ticker))
+            market_cache.put(_key(ticker), entry["value"] if entry else default_metadata(ticker), METADATA_FAILURE_TTL)
+
+def _run_pending():
+    global _worker
+    while True:
+        with _lock:
+            batch = list(_pending)
+            if not batch:
+                _worker = None
+                return
+        try:
+            refresh_metadata(batch)
+        finally:
+            with _lock:
+                _pending.difference_update(batch)
+
+def schedule_refresh(tickers):
+    """Ajoute des tickers à la file de fond (un seul thread actif par processus)"""
+    global _worker
+    with _lock:
+        _pending.update(tickers)
+        if _worker is None and _pending:
+            _worker = threading.Thread(target=_run_pending, name="metadata-refresh", daemon=True)
+            _worker.start()
+
+def get_metadata(tickers):
+    """Métadonnées depuis le cache, sans jamais attendre le réseau
+
+    Les tickers absents ou périmés sont rafraîchis en arrière-plan ; en
+    attendant, ils reçoivent la dernière valeur connue ou des valeurs par
+    défaut marquées "pending". Chaque entrée garde son propre TTL (plus
+    court après un échec).
+    """
+    tickers = list(dict.fromkeys(tickers))
+    entries = market_cache.get_entries([_key(t) for t in tickers])
+    result, to_refresh = {}, []
+    for t in tickers:
+        entry = entries.get(_key(t))
+        if entry is None:
+            result[t] = dict(default_metadata(t), pending=True)
+            to_refresh.append(t)
+        else:
+            result[t] = dict(entry["value"], pending=False)
+            if entry["stale"]:
+                to_refresh.append(t)
+    if to_refresh:
+        schedule_refresh(to_refresh)
+    return result
@@ -0,0 +1,152 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+import history_store
+from db import get_connection
+from market_data import download_closes
+from storage import PORTFOLIO_FILE
+from instrumentation import timed
+
+# Profondeur de l'estimation affichée avant le premier jour enregistré
+NAV_BACKFILL_DAYS = 365
+# Jours relus avant le début pour propager les derniers cours connus (week-ends, fériés)
+FFILL_LOOKBACK_DAYS = 10
+FX_TICKER = "EURUSD=X"
+
+# Série en ajout seul : une journée enregistrée n'est jamais recalculée. Seules
+# les journées valorisées au fil de l'eau y entrent ; le passé antérieur n'est
+# qu'estimé (estimate_nav) et jamais figé.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nav_history (
+    date TEXT PRIMARY KEY,
+    bourse REAL NOT NULL,
+    crypto REAL NOT NULL,
+    total REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+def _conn():
+    return get_connection(PORTFOLIO_FILE, SCHEMA)
+
+def crypto_ticker(symbol):
+    """Ticker Yahoo d'une crypto (cotation en USD)"""
+    return f"{symbol.upper()}-USD"
+
+def holdings(data):
+    """Quantités détenues par ticker, et prix de repli quand l'historique manque"""
+    stocks, stock_prices, coins, coin_prices = {}, {}, {}, {}
+    for p in data["bourse"]:
+        stocks[p["ticker"]] = stocks.get(p["ticker"], 0) + p["qty"]
+        stock_prices[p["ticker"]] = p.get("prix_actuel", p["prix_achat"])
+    for c in data["crypto"]:
+        t = crypto_ticker(c["ticker"])
+        coins[t] = coins.get(t, 0) + c["qty"]
+        coin_prices[t] = c.get("prix_actuel_usd", c["prix_achat_usd"])
+    return stocks, stock_prices, coins, coin_prices
+
+def last_nav_date():
+    row = _conn().execute("SELECT MAX(date) FROM nav_history").fetchone()
+    return row[0] if row else None
+
+def compute_nav(data, closes, start, end):
+    """NAV quotidienne (bourse, crypto en EUR, total) entre start et end inclus
+
+    closes : DataFrame dates x tickers contenant aussi EURUSD=X. Le calendrier
+    est l'union de toutes les places ; chaque cours est propagé jusqu'à la
+    séance suivante de son marché.
+    """
+    stocks, stock_prices, coins, coin_prices = holdings(data)
+    days = pd.date_range(start, end, freq="D")
+    closes = closes.reindex(closes.index.union(days)).sort_index().ffill().reindex(days)
+
+    def valued(qty_by_ticker, fallback):
+        tickers = list(qty_by_ticker)
+        if not tickers:
+            return np.zeros(len(closes))
+        px = closes.reindex(columns=tickers)
+        # Ticker sans historique : on garde son dernier prix connu
+        px = px.fillna(pd.Series(fallback)).to_numpy(dtype=float)
+        return px @ np.array([qty_by_ticker[t] for t in tickers], dtype=float)
+
+    fx = closes[FX_TICKER] if FX_TICKER in closes.columns else pd.Series(np.nan, index=closes.index)
+    taux = (1 / fx).fillna(data.get("taux_usd_eur", 0.92)).to_numpy(dtype=float)
+    bourse = valued(stocks, stock_prices)
+    crypto = (valued(coins, coin_prices) + data["crypto_extras"]["disponible_usd"]) * taux
+    return pd.DataFrame({"bourse": bourse, "crypto": crypto, "total": bourse + crypto}, index=closes.index)
+
+@timed("nav.mise_a_jour")
+def update_nav(data, download=download_closes, today=None):
+    """Ajoute à l'historique les journées terminées manquantes ; retourne le nombre de jours ajoutés
+
+    Le premier appel n'enregistre que la veille. Ensuite, un seul appel par
+    jour fait réellement quelque chose. Les journées d'une interruption (app
+    arrêtée plusieurs jours) sont valorisées avec les quantités courantes.
+    Les clôtures de NAV_BACKFILL_DAYS jours sont aussi mises sur disque pour
+    estimate_nav.
+    """
+    today = today or date.today()
+    end = today - timedelta(days=1)
+    last = last_nav_date()
+    start = date.fromisoformat(last) + timedelta(days=1) if last else end
+    if start > end:
+        return 0
+    stocks, _, coins, _ = holdings(data)
+    tickers = list(stocks) + list(coins) + [FX_TICKER]
+    lookback = (min(start, today - timedelta(days=NAV_BACKFILL_DAYS)) - timedelta(days=FFILL_LOOKBACK_DAYS)).isoformat()
+    closes = history_store.get_closes_since(tickers, lookback, download)
+    if closes.empty:
+        return 0
+    nav = compute_nav(data, closes, pd.Timestamp(start), pd.Timestamp(end))
+    # Seules les journées couvertes par au moins une cotation sont figées
+    nav = nav[nav.index <= closes.index.max()]
+    conn = _conn()
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO nav_history (date, bourse, crypto, total) VALUES (?, ?, ?, ?)",
+            [(d.strftime("%Y-%m-%d"), b, c, t) for d, b, c, t in nav.itertuples()],
+        )
+    return len(nav)
+
+def estimate_nav(data, before=None, today=None):
+    """Estimation (non enregistrée) des NAV_BACKFILL_DAYS jours précédant before, ou la veille
+
+    Approximation : chaque journée passée est valorisée avec les quantités
+    actuelles, les achats et ventes de la période sont ignorés. Lit les
+    clôtures déjà sur disque, sans réseau.
+    """
+    today = today or date.today()
+    start = today - timedelta(days=NAV_BACKFILL_DAYS)
+    end = (pd.Timestamp(before).date() if before is not None else today) - timedelta(days=1)
+    empty = pd.DataFrame(columns=["bourse", "crypto", "total"], dtype=float)
+    if start > end:
+        return empty
+    stocks, _, coins, _ = holdings(data)
+    closes = history_store.load_closes(list(stocks) + list(coins) + [FX_TICKER], (start - timedelta(days=FFILL_LOOKBACK_DAYS)).isoformat())
+    if closes.empty:
+        return empty
+    nav = compute_nav(data, closes, pd.Timestamp(start), pd.Timestamp(end))
+    return nav[nav.index <= closes.index.max()]
+
+def load_nav(start=None):
+    """Historique de NAV enregistré (DataFrame indexé par date)"""
+    rows = _conn().execute(
+        "SELECT date, bourse, crypto, total FROM nav_history WHERE date >= ? ORDER BY date", (start or "",)
+    ).fetchall()
+    df = pd.DataFrame(rows, columns=["date", "bourse", "crypto", "total"]).set_index("date")
+    df.index = pd.to_datetime(df.index)
+    return df
+
+def reset():
+    """Efface l'historique de NAV (repart du portefeuille courant au prochain update_nav)"""
+    conn = _conn()
+    with conn:
+        conn.execute("DELETE FROM nav_history")
+
+def drawdown(total):
+    """Baisse depuis le plus haut précédent, en %"""
+    total = np.asarray(total, dtype=float)
+    if len(total) == 0:
+        return total
+    return (total / np.maximum.accumulate(total) - 1) * 100
@@ -0,0 +1,111 @@
+import numpy as np
+
+from instrumentation import timed
+
+# ============== PROJECTIONS (FORMULE FERMÉE) ==============
+
+def monthly_rate(rend_annuel_pct):
+    """Taux mensuel équivalent à un rendement annuel en %"""
+    return (1 + np.asarray(rend_annuel_pct, dtype=float) / 100) ** (1 / 12) - 1
+
+def project(capital, versement, taux, periodes):
+    """Valeur après 0..periodes périodes : capital composé + versements en fin de période
+
+    V_n = C·(1+r)^n + v·((1+r)^n − 1)/r (ou C + v·n si r = 0). capital,
+    versement et taux peuvent être des tableaux (grille de scénarios) : le
+    résultat a leur forme diffusée, plus un dernier axe de periodes + 1 points.
+    """
+    capital, versement, taux = (np.asarray(x, dtype=float)[..., None] for x in (capital, versement, taux))
+    n = np.arange(periodes + 1, dtype=float)
+    croissance = (1 + taux) ** n
+    # (g − 1)/r, prolongé par n quand r = 0
+    annuite = np.divide(croissance - 1, taux, out=np.broadcast_to(n, croissance.shape).copy(), where=taux != 0)
+    return capital * croissance + versement * annuite
+
+def periods_to_target(capital, versement, taux, cible):
+    """Nombre de périodes (entier) pour atteindre cible ; inf si jamais atteint
+
+    On résout C·g + v·(g − 1)/r = cible en g = (1+r)^n, puis n = ln g / ln(1+r).
+    """
+    capital, versement, taux, cible = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (capital, versement, taux, cible)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = versement / taux
+        g = (cible + k) / (capital + k)
+        n_taux = np.log(g) / np.log1p(taux)
+        n_zero = (cible - capital) / versement
+    n = np.where(taux != 0, n_taux, n_zero)
+    # g <= 0, NaN ou n négatif : la cible n'est jamais atteinte
+    n = np.where(np.isfinite(n) & (n >= 0), np.ceil(n - 1e-9), np.inf)
+    return np.where(capital >= cible, 0.0, n)
+
+def scenario_grid(capital, versements, rendements_pct, mois, cible):
+    """Valeur finale et mois pour atteindre la cible, pour chaque (rendement, versement)
+
+    Retourne deux tableaux de forme (len(rendements_pct), len(versements)).
+    """
+    taux = monthly_rate(rendements_pct)[:, None]
+    versements = np.asarray(versements, dtype=float)[None, :]
+    g = (1 + taux) ** mois
+    annuite = np.divide(g - 1, taux, out=np.full(g.shape, float(mois)), where=taux != 0)
+    finale = capital * g + versements * annuite
+    return finale, periods_to_target(capital, versements, taux, cible)
+
+# ============== MONTE CARLO ==============
+
+# Points conservés pour les bandes de percentiles (le calcul reste mensuel)
+MC_SAMPLE_POINTS = 60
+PERCENTILES = (5, 25, 50, 75, 95)
+
+def lognormal_returns(rend_annuel_pct, vol_annuelle_pct):
+    """Tirage de facteurs de croissance mensuels (1 + r) log-normaux, d'espérance annuelle rend
+
+    Variables antithétiques (z, −z) : deux fois moins de tirages aléatoires et
+    une variance réduite. Calcul en float32, largement suffisant ici.
+    """
+    sigma = np.float32(vol_annuelle_pct / 100 / np.sqrt(12))
+    mu = np.float32(np.log1p(rend_annuel_pct / 100) / 12 - sigma ** 2 / 2)
+    def draw(rng, n):
+        z = rng.standard_normal((n + 1) // 2, dtype=np.float32)
+        z = np.concatenate([z, -z])[:n]
+        z *= sigma
+        z += mu
+        return np.exp(z, out=z)
+    return draw
+
+def bootstrap_returns(rendements_mensuels):
+    """Tirage avec remise parmi des rendements mensuels historiques (facteurs 1 + r)"""
+    hist = np.asarray(rendements_mensuels, dtype=float)
+    hist = 1 + hist[np.isfinite(hist)]
+    if len(hist) == 0:
+        raise ValueError("Aucun rendement historique exploitable")
+    def draw(rng, n):
+        return hist[rng.integers(0, len(hist), n)]
+    return draw
+
+@timed("calcul.monte_carlo")
+def monte_carlo(capital, versement, mois, draw, n_paths=50000, cible=None, seed=None, percentiles=PERCENTILES):
+    """Simule n_paths trajectoires mois par mois et retourne leurs percentiles
+
+    Les rendements sont générés un mois à la fois pour toutes les trajectoires :
+    la mémoire reste en O(n_paths) quelle que soit la durée. Seuls ~60 points
+    sont gardés pour les bandes ; la cible est vérifiée chaque mois.
+    """
+    rng = np.random.default_rng(seed)
+    valeurs = np.full(n_paths, float(capital))
+    atteint = valeurs >= cible if cible is not None else None
+    pas = max(1, -(-mois // MC_SAMPLE_POINTS))
+    points, bandes = [0], [np.full(len(percentiles), float(capital))]
+    for t in range(1, mois + 1):
+        valeurs *= draw(rng, n_paths)
+        valeurs += versement
+        if atteint is not None:
+            atteint |= valeurs >= cible
+        if t % pas == 0 or t == mois:
+            points.append(t)
+            bandes.append(np.percentile(valeurs, percentiles))
+    bandes = np.array(bandes).T
+    return {
+        "mois": np.array(points),
+        "percentiles": {p: bandes[i] for i, p in enumerate(percentiles)},
+        "proba_cible": float(atteint.mean()) if atteint is not None else None,
+    }
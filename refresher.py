@@ -0,0 +1,237 @@
+"""Mise à jour des cours en arrière-plan, découplée des reruns Streamlit
+
+Le worker applique les règles d'actualisation (bourse 5 min pendant la
+séance de chaque place, crypto 1 h, immobilier 1 mois) et publie un instantané dans le cache partagé ; l'UI ne
+fait que le lire. Ses téléchargements Yahoo passent par le même verrou
+(market_data.YAHOO_LOCK) que ceux des pages (historique du comparateur, du
+screener...) : jamais deux yf.download en même temps dans le processus.
+Lancement : un thread par processus Streamlit (start()),
+ou en ligne de commande :
+
+    python refresher.py            # boucle
+    python refresher.py --once     # une passe (cron)
+"""
+import argparse
+import threading
+import time
+from datetime import datetime
+
+import dca
+import ledger
+import market_cache
+import market_calendar
+import nav
+from crypto_prices import get_crypto_prices
+from market_data import fetch_concurrently, get_forex_rate, get_stock_prices
+from storage import load_data, save_data
+from instrumentation import timed
+
+SNAPSHOT_KEY = "snapshot:prices"
+# L'instantané ne se périme pas : ce sont les règles ci-dessous qui décident
+SNAPSHOT_TTL = 365 * 24 * 3600
+# Intervalle entre deux vérifications du worker (secondes)
+REFRESH_INTERVAL = 60
+# Cotation d'une action pendant que sa place est en séance (secondes)
+STOCK_INTERVAL = 300
+# Rattrapage DCA et historique de NAV : une tentative au plus par intervalle
+# (secondes), pour ne pas retenter le téléchargement à chaque passe quand le
+# réseau manque
+CATCH_UP_INTERVAL = 900
+# Dernier passage du worker ayant enregistré des achats DCA : les sessions
+# relisent alors le portefeuille (échéances avancées)
+DCA_KEY = "dca:dernier_passage"
+
+_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_wake = threading.Event()
+_force = False
+_worker = None
+_catch_up_tried = None
+
+# ============== RÈGLES D'ACTUALISATION ==============
+
+def should_update_crypto(last_update):
+    """MAJ crypto toutes les heures"""
+    if not last_update:
+        return True
+    try:
+        last = datetime.fromisoformat(last_update)
+        elapsed = (datetime.now() - last).total_seconds()
+        return elapsed > 3600  # 1 heure
+    except:
+        return True
+
+def should_update_immo(last_update):
+    """MAJ immobilier tous les mois"""
+    if not last_update:
+        return True
+    try:
+        last = datetime.fromisoformat(last_update)
+        return (datetime.now() - last).days > 30
+    except:
+        return True
+
+# ============== INSTANTANÉ ==============
+
+def empty_snapshot():
+    return {
+        "taux_usd_eur": None, "stocks": {}, "crypto": {},
+        "last_update_stocks": None, "last_update_crypto": None, "last_update_immo": None,
+        "checked": {}, "missing": [], "missing_crypto": [], "errors": {}, "published_at": None,
+    }
+
+def latest_snapshot():
+    """Dernier instantané publié (lecture disque, jamais de réseau)"""
+    entry = market_cache.get_entry(SNAPSHOT_KEY)
+    return dict(empty_snapshot(), **entry["value"]) if entry else empty_snapshot()
+
+@timed("refresher.passe")
+def refresh(data=None, force=False):
+    """Une passe de mise à jour : interroge les sources dues et publie l'instantané
+
+    Les échéances sont lues dans l'instantané partagé : si un autre processus
+    vient de rafraîchir, cette passe ne fait rien.
+    """
+    with _refresh_lock:
+        data = data or load_data()
+        snap = latest_snapshot()
+        tickers = list(dict.fromkeys(p["ticker"] for p in data["bourse"]))
+        # Seuls les titres dont la place est en séance (ou vient de clôturer) sont recotés ;
+        # une ligne jamais cotée l'est sans attendre
+        dus = [t for t in tickers if force or market_calendar.needs_refresh(t, snap["checked"].get(t), STOCK_INTERVAL)]
+        # Une crypto ajoutée depuis la dernière passe est cotée sans attendre
+        nouvelles = [c for c in data["crypto"] if c["ticker"].upper() not in snap["crypto"] and c["ticker"].upper() not in snap["missing_crypto"]]
+
+        should_crypto = force or bool(nouvelles) or should_update_crypto(snap["last_update_crypto"])
+
+        # CoinGecko part en même temps que Yahoo ; côté Yahoo, change puis actions en série
+        # dans un seul job (yf.download n'est pas sûr entre threads)
+        def yahoo():
+            return {"forex": get_forex_rate(), "stocks": get_stock_prices(dus) if dus else None}
+        jobs = {"yahoo": yahoo}
+        if should_crypto and data["crypto"]:
+            jobs["crypto"] = lambda: get_crypto_prices(data["crypto"])
+        results, errors = fetch_concurrently(jobs)
+        results.update(results.pop("yahoo", {}))
+        if "yahoo" in errors:
+            errors["stocks" if dus else "forex"] = errors.pop("yahoo")
+
+        now = datetime.now().isoformat()
+        if results.get("forex"):
+            snap["taux_usd_eur"] = results["forex"]
+        if results.get("crypto") is not None:
+            snap["crypto"].update(results["crypto"])
+            snap["missing_crypto"] = [c["ticker"].upper() for c in data["crypto"] if c["ticker"].upper() not in results["crypto"]]
+            if results["crypto"]:
+                snap["last_update_crypto"] = now
+        if dus:
+            stock_prices = results.get("stocks") or {}
+            snap["stocks"].update(stock_prices)
+            # Échec complet (réseau, circuit ouvert) : rien n'est marqué, la passe suivante
+            # réessaie et les derniers cours connus restent servis
+            if stock_prices:
+                snap["checked"].update(dict.fromkeys(dus, now))
+                snap["missing"] = [t for t in tickers if (t in dus and t not in stock_prices) or (t not in dus and t in snap["missing"])]
+            if stock_prices:
+                snap["last_update_stocks"] = now
+        # IMMOBILIER - tous les mois (intérêts)
+        if force or should_update_immo(snap["last_update_immo"]):
+            snap["last_update_immo"] = now
+        snap["errors"] = {name: f"{type(e).__name__}: {e}" for name, e in errors.items()}
+        snap["published_at"] = now
+        market_cache.put(SNAPSHOT_KEY, snap, SNAPSHOT_TTL)
+        _catch_up(snap)
+        return snap
+
+def _catch_up(snap):
+    """Échéances DCA passées puis journées terminées manquantes de la NAV
+
+    Seuls calculs qui téléchargent de l'historique : ils tournent ici, jamais
+    dans un rerun. Les échéances avancées sont enregistrées (save_data ne
+    touche que les champs changés).
+    """
+    global _catch_up_tried
+    now = time.monotonic()
+    if _catch_up_tried is not None and now - _catch_up_tried < CATCH_UP_INTERVAL:
+        return
+    _catch_up_tried = now
+    try:
+        base = {}
+        data = apply_snapshot(ledger.sync_portfolio(load_data(base)), snap)
+        executes = dca.execute_due(data)
+        save_data(ledger.sync_portfolio(data), base)
+        if executes:
+            market_cache.put(DCA_KEY, {"at": datetime.now().isoformat(), "executes": executes}, SNAPSHOT_TTL)
+        nav.update_nav(data)
+    except Exception:
+        # Historique injoignable : la tentative suivante attend CATCH_UP_INTERVAL
+        pass
+
+def last_dca():
+    """Dernier passage DCA du worker ({"at", "executes"}), ou None (lecture disque)"""
+    entry = market_cache.get_entry(DCA_KEY)
+    return entry["value"] if entry else None
+
+def apply_snapshot(data, snap):
+    """Recopie les cours de l'instantané dans les positions (aucun appel réseau)"""
+    if snap["taux_usd_eur"]:
+        data["taux_usd_eur"] = snap["taux_usd_eur"]
+    for c in data["crypto"]:
+        q = snap["crypto"].get(c["ticker"].upper())
+        if q:
+            c["prix_actuel_usd"] = q["usd"]
+            c["change_24h"] = q["change"]
+    for p in data["bourse"]:
+        q = snap["stocks"].get(p["ticker"])
+        if q:
+            p["prix_actuel"] = q["price"]
+            p["change_24h"] = q["change"]
+    for key in ("last_update_stocks", "last_update_crypto", "last_update_immo"):
+        if snap[key]:
+            data[key] = snap[key]
+    return data
+
+# ============== WORKER ==============
+
+def _run(interval):
+    global _force
+    while True:
+        # Effacé avant la passe : une demande arrivée pendant celle-ci relance aussitôt
+        _wake.clear()
+        with _lock:
+            force, _force = _force, False
+        try:
+            refresh(force=force)
+        except Exception:
+            # Une passe ratée ne doit pas arrêter le worker : la suivante réessaie
+            pass
+        _wake.wait(interval)
+
+def start(interval=REFRESH_INTERVAL):
+    """Démarre le worker du processus s'il ne tourne pas déjà"""
+    global _worker
+    with _lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_run, args=(interval,), name="price-refresher", daemon=True)
+            _worker.start()
+
+def request_refresh():
+    """Demande au worker une passe forcée immédiate, sans l'attendre"""
+    global _force
+    with _lock:
+        _force = True
+    _wake.set()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Met à jour les cours et publie l'instantané partagé")
+    parser.add_argument("--once", action="store_true", help="une seule passe puis sortie")
+    parser.add_argument("--force", action="store_true", help="ignorer les règles d'actualisation")
+    parser.add_argument("--interval", type=float, default=REFRESH_INTERVAL, help="secondes entre deux passes")
+    args = parser.parse_args()
+    while True:
+        snap = refresh(force=args.force)
+        print(f"{snap['published_at']} • {len(snap['stocks'])} actions, {len(snap['crypto'])} cryptos"
+              f"{' • erreurs: ' + ', '.join(snap['errors']) if snap['errors'] else ''}")
+        if args.once:
+            break
+        time.sleep(args.interval)
@@ -0,0 +1,124 @@
+from datetime import date
+from html import escape
+
+# ============== GABARITS HTML ==============
+
+# Gabarits compilés une fois (chaînes de format) : le style vient des classes
+# CSS du bloc <style> de l'app, pas d'attributs inline répétés à chaque ligne.
+# Chaque liste est rendue en un seul bloc HTML, donc un seul st.markdown.
+
+PERFORMER_ROW = '<div class="performer-row"><span class="performer-name">{nom}</span><span class="performer-value {signe}">{perf:+.1f}%</span></div>'
+
+DCA_CARD = (
+    '<div class="dca-card"><div class="dca-head"><span class="dca-name">{nom}</span><span class="dca-amount">{montant}</span></div>'
+    '<div class="dca-date">{prefixe}{date} ({jours}j)</div></div>'
+)
+
+DETAIL_ROW = '<div class="detail-row"><span class="detail-label">{label}</span><span class="detail-value {classe}">{valeur}</span></div>'
+
+POSITION_CARD = (
+    '<details class="pos-card"><summary><span class="pos-name">{titre}</span>'
+    '<span class="pos-summary-value">{valeur} <span class="{signe}">{perf:+.2f}%</span></span></summary>'
+    '{badge}<div class="pos-grid"><div>{gauche}</div><div>{droite}</div></div></details>'
+)
+
+STAKING_BADGE = '<span class="staking-badge">🔒 Staké {apy:.2f}% APY • +{gains:.2f}$</span>'
+
+RANK_CARD = (
+    '<div class="rank-card rank-{podium}"><div class="rank-main"><div class="rank-icon">{icone}</div>'
+    '<div><div class="rank-name">{nom} {badge}</div><div class="rank-ticker">{ticker}</div></div></div>'
+    '<div class="rank-stats">{stats}</div></div>'
+)
+RANK_STAT = '<div class="rank-stat"><div class="rank-stat-label">{label}</div><div class="rank-stat-value {classe}">{valeur}</div></div>'
+PORTFOLIO_BADGE = '<span class="badge-portfolio">📂 PORTFOLIO</span>'
+
+RANK_ICONS = {1: "🥇", 2: "🥈", 3: "🥉"}
+
+# Au-delà, une liste de positions passe en tableau (st.dataframe)
+CARD_LIMIT = 50
+
+def _signe(x):
+    return "change-positive" if x > 0 else "change-negative"
+
+def _rows(rows):
+    return "".join(DETAIL_ROW.format(label=label, valeur=valeur, classe=classe) for label, valeur, classe in rows)
+
+def performer_rows(positions):
+    """Lignes Top/Flop : nom et performance"""
+    return "".join(
+        PERFORMER_ROW.format(nom=escape(p["nom"]), perf=p.get("perf", 0), signe=_signe(p.get("perf", 0)))
+        for p in positions
+    )
+
+def dca_cards(orders, today=None, detail=False):
+    """Cartes des prochains DCA ; detail ajoute nom complet et fréquence"""
+    today = today or date.today()
+    html = []
+    for o in orders:
+        jours = (date.fromisoformat(o["prochaine_execution"]) - today).days
+        html.append(DCA_CARD.format(
+            nom=escape(o.get("nom", o["crypto"]) if detail else o["crypto"]),
+            montant=f'{o["montant_eur"]}€ / {o["frequence_jours"]}j' if detail else f'{o["montant_eur"]}€',
+            prefixe="Prochain: " if detail else "", date=o["prochaine_execution"], jours=jours,
+        ))
+    return "".join(html)
+
+def stock_cards(positions):
+    """Positions bourse dépliables (details/summary : aucun aller-retour serveur)"""
+    html = []
+    for p in positions:
+        gain = p.get("gain", 0)
+        html.append(POSITION_CARD.format(
+            titre=f"{escape(p['nom'])} ({escape(p['ticker'])})", valeur=f"{p.get('valeur_actuelle', 0):,.2f}€",
+            perf=p.get("perf", 0), signe=_signe(gain), badge="",
+            gauche=_rows([
+                ("Position de base", f"{p.get('position_base', 0):,.2f}€", ""),
+                ("Valeur actuelle", f"{p.get('valeur_actuelle', 0):,.2f}€", ""),
+                ("Gain/Perte", f"{gain:+,.2f}€", _signe(gain)),
+            ]),
+            droite=_rows([
+                ("Quantité", f"{p['qty']:.6f}", ""),
+                ("Prix d'achat", f"{p['prix_achat']:.2f}€", ""),
+                ("Prix actuel", f"{p.get('prix_actuel', p['prix_achat']):.2f}€", ""),
+            ]),
+        ))
+    return "".join(html)
+
+def crypto_cards(positions):
+    html = []
+    for c in positions:
+        gain = c.get("gain_eur", 0)
+        staked = c.get("is_staked")
+        html.append(POSITION_CARD.format(
+            titre=f"{'🔒 ' if staked else ''}{escape(c['nom'])}", valeur=f"{c.get('valeur_actuelle_eur', 0):,.2f}€",
+            perf=c.get("perf", 0), signe=_signe(gain),
+            badge=STAKING_BADGE.format(apy=c.get("staking_apy", 0), gains=c.get("staking_gains_usd", 0)) if staked else "",
+            gauche=_rows([
+                ("Position de base", f"{c.get('position_base_eur', 0):,.2f}€", ""),
+                ("Valeur actuelle", f"{c.get('valeur_actuelle_eur', 0):,.2f}€", ""),
+                ("Gain/Perte", f"{gain:+,.2f}€", _signe(gain)),
+            ]),
+            droite=_rows([
+                ("Quantité", f"{c['qty']:.8f}", ""),
+                ("Prix actuel", f"{c.get('prix_actuel_usd', c['prix_achat_usd']):,.2f}$", ""),
+                ("Var. 24h", f"{c.get('change_24h', 0):+.2f}%", ""),
+            ]),
+        ))
+    return "".join(html)
+
+def ranking_cards(ranked, portfolio_tickers):
+    """Cartes du classement du comparateur : [(ticker, infos)] déjà triés"""
+    html = []
+    for rank, (ticker, d) in enumerate(ranked, 1):
+        stats = "".join(RANK_STAT.format(label=label, valeur=valeur, classe=classe) for label, valeur, classe in [
+            ("Performance", f"{d['perf']:+.2f}%", _signe(d["perf"]) + " rank-perf"),
+            ("Prix", f"{d['current_price']:.2f} {escape(d['currency'])}", ""),
+            ("TER", f"{d['expense_ratio'] * 100:.2f}%" if d["expense_ratio"] > 0 else "N/A", "rank-muted"),
+            ("Dividende", f"{d['dividend_yield'] * 100:.2f}%" if d["dividend_yield"] > 0 else "N/A", "rank-muted"),
+        ])
+        html.append(RANK_CARD.format(
+            podium=rank if rank <= 3 else "n", icone=RANK_ICONS.get(rank, f"#{rank}"),
+            nom=escape(d["name"][:30]), badge=PORTFOLIO_BADGE if ticker in portfolio_tickers else "",
+            ticker=escape(ticker), stats=stats,
+        ))
+    return "".join(html)
@@ -0,0 +1,170 @@
+import threading
+import time
+
+import instrumentation
+
+# ============== ACCÈS RÉSILIENT AUX FOURNISSEURS ==============
+
+# Par fournisseur : débit (jetons/s) et rafale, tentatives et attente progressive,
+# nombre d'échecs consécutifs qui ouvre le circuit et durée d'ouverture initiale
+PROVIDERS = {
+    "yahoo": {"rate": 2.0, "burst": 5, "retries": 1, "backoff": 1.0, "max_backoff": 8.0, "failures": 5, "cooldown": 60.0},
+    # Offre gratuite CoinGecko : ~30 appels/minute
+    "coingecko": {"rate": 0.5, "burst": 5, "retries": 3, "backoff": 1.0, "max_backoff": 8.0, "failures": 3, "cooldown": 60.0},
+}
+# L'ouverture double à chaque rechute, jusqu'à ce plafond (secondes)
+MAX_COOLDOWN = 900.0
+
+class CircuitOpen(Exception):
+    """Circuit ouvert : l'appel n'est pas tenté, l'appelant sert la dernière valeur connue"""
+
+class Throttled(Exception):
+    """Réponse « trop de requêtes » ; retry_after en secondes si le fournisseur l'indique"""
+    def __init__(self, message="trop de requêtes", retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class NoData(Exception):
+    """Réponse vide (ticker inconnu, aucune cotation) : le fournisseur a répondu, ce n'est pas une panne"""
+
+def is_failure(error):
+    """Erreur de transport ou de débit ? Seules celles-ci sont retentées et comptent pour le disjoncteur
+
+    Une erreur propre à la requête (ticker mal saisi, .info introuvable, HTTP
+    4xx) ne dit rien de la santé du fournisseur : elle ne doit pas bloquer les
+    cours et le change de toutes les sessions.
+    """
+    if isinstance(error, Throttled) or "RateLimit" in type(error).__name__:
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    # Connexion, délai dépassé, DNS... (requests et curl_cffi en dérivent aussi)
+    return isinstance(error, OSError)
+
+_lock = threading.Lock()
+_state = {}
+
+def _new_state(name):
+    conf = PROVIDERS[name]
+    return {
+        "tokens": float(conf["burst"]), "refilled_at": time.monotonic(),
+        "circuit": "fermé", "consecutive_failures": 0, "opened_at": None, "cooldown": conf["cooldown"],
+        "calls": 0, "successes": 0, "failures": 0, "rejected": 0, "throttled": 0, "waited": 0.0,
+        "last_error": None, "last_success": None,
+    }
+
+def _get_state(name):
+    if name not in _state:
+        _state[name] = _new_state(name)
+    return _state[name]
+
+def configure(name, **params):
+    """Ajuste (ou crée) un fournisseur ; remet son état à zéro (utile contre un faux serveur)"""
+    with _lock:
+        PROVIDERS[name] = dict(PROVIDERS.get(name, PROVIDERS["yahoo"]), **params)
+        _state[name] = _new_state(name)
+
+def reset(name=None):
+    with _lock:
+        for n in [name] if name else list(_state):
+            _state[n] = _new_state(n)
+
+def _acquire(name):
+    """Seau à jetons : attend qu'un jeton soit disponible (débit moyen borné, rafales permises)"""
+    conf = PROVIDERS[name]
+    while True:
+        with _lock:
+            s = _get_state(name)
+            now = time.monotonic()
+            s["tokens"] = min(conf["burst"], s["tokens"] + (now - s["refilled_at"]) * conf["rate"])
+            s["refilled_at"] = now
+            if s["tokens"] >= 1:
+                s["tokens"] -= 1
+                return
+            wait = (1 - s["tokens"]) / conf["rate"]
+            s["waited"] += wait
+        time.sleep(wait)
+
+def _allow(name):
+    """Le circuit laisse-t-il passer l'appel ? Après la période d'ouverture, un seul essai (semi-ouvert)"""
+    with _lock:
+        s = _get_state(name)
+        if s["circuit"] == "fermé":
+            return True
+        if s["circuit"] == "ouvert" and time.monotonic() - s["opened_at"] >= s["cooldown"]:
+            s["circuit"] = "semi-ouvert"
+            return True
+        s["rejected"] += 1
+        return False
+
+def _record(name, error=None):
+    conf = PROVIDERS[name]
+    with _lock:
+        s = _get_state(name)
+        if error is None:
+            s["successes"] += 1
+            s["consecutive_failures"] = 0
+            s["circuit"] = "fermé"
+            s["cooldown"] = conf["cooldown"]
+            s["last_success"] = time.time()
+            return
+        s["failures"] += 1
+        s["consecutive_failures"] += 1
+        s["last_error"] = f"{type(error).__name__}: {error}"
+        if s["circuit"] == "semi-ouvert":
+            # L'essai a échoué : on rouvre, plus longtemps
+            s["cooldown"] = min(s["cooldown"] * 2, MAX_COOLDOWN)
+            s["circuit"], s["opened_at"] = "ouvert", time.monotonic()
+        elif s["consecutive_failures"] >= conf["failures"]:
+            s["circuit"], s["opened_at"] = "ouvert", time.monotonic()
+
+def call(name, fn):
+    """Appelle fn() sous la protection du fournisseur name
+
+    Débit limité, nouvelles tentatives avec attente exponentielle (ou le
+    Retry-After d'un Throttled), puis circuit ouvert après trop d'échecs :
+    lève CircuitOpen sans toucher au réseau tant qu'il le reste. Seules les
+    erreurs de transport ou de débit (is_failure) comptent comme échecs ; les
+    autres sont relevées telles quelles.
+    """
+    conf = PROVIDERS[name]
+    if not _allow(name):
+        raise CircuitOpen(f"{name}: circuit ouvert, dernière valeur connue servie")
+    for attempt in range(conf["retries"] + 1):
+        _acquire(name)
+        with _lock:
+            _get_state(name)["calls"] += 1
+        instrumentation.count(f"reseau.{name}")
+        try:
+            result = fn()
+        except Exception as e:
+            if not is_failure(e):
+                # Le fournisseur a répondu : pas de nouvel essai, et un essai semi-ouvert referme le circuit
+                _record(name)
+                raise
+            if isinstance(e, Throttled):
+                with _lock:
+                    _get_state(name)["throttled"] += 1
+            if attempt == conf["retries"]:
+                _record(name, e)
+                raise
+            wait = getattr(e, "retry_after", None)
+            if wait is None:
+                wait = conf["backoff"] * 2 ** attempt
+            time.sleep(min(wait, conf["max_backoff"]))
+            continue
+        _record(name)
+        return result
+
+def health():
+    """État de chaque fournisseur, pour la sidebar et les logs"""
+    with _lock:
+        result = {}
+        for name in PROVIDERS:
+            s = dict(_get_state(name))
+            done = s["successes"] + s["failures"]
+            s["success_rate"] = s["successes"] / done if done else None
+            s["reopens_in"] = max(0.0, s["cooldown"] - (time.monotonic() - s["opened_at"])) if s["circuit"] == "ouvert" else 0.0
+            result[name] = s
+        return result
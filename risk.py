@@ -0,0 +1,172 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import history_store
+from market_data import download_closes
+from nav import FX_TICKER, holdings
+from instrumentation import timed
+
+# ============== ANALYSE DE RISQUE ==============
+
+TRADING_DAYS = 252
+# Taux sans risque annuel (%) pour Sharpe / Sortino
+RISK_FREE_RATE = 3.0
+BENCHMARK = "CW8.PA"
+ROLLING_WINDOW = 21
+# Nombre d'analyses gardées en mémoire (clé : positions + version des cours)
+CACHE_SIZE = 8
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+def aligned_returns(closes):
+    """Rendements journaliers sur un calendrier commun (jours ouvrés, union des places)
+
+    Chaque cours est propagé jusqu'à la séance suivante de son marché ; les
+    mouvements crypto du week-end sont ainsi reportés sur le lundi. Avant la
+    première cotation d'un ticker, ses rendements restent NaN.
+    """
+    closes = closes[closes.index.dayofweek < 5].sort_index().ffill()
+    returns = closes.pct_change(fill_method=None).iloc[1:]
+    return returns.index, returns.to_numpy(dtype=float)
+
+def annualized_volatility(r):
+    """Volatilité annualisée en %, par colonne"""
+    return np.nanstd(r, axis=0, ddof=1) * np.sqrt(TRADING_DAYS) * 100
+
+def rolling_volatility(r, window=ROLLING_WINDOW):
+    """Volatilité glissante annualisée en % (sommes cumulées : O(T) quelle que soit la fenêtre)"""
+    r = np.nan_to_num(np.asarray(r, dtype=float))
+    if len(r) < window:
+        return np.full(r.shape, np.nan)
+    s1 = np.cumsum(np.insert(r, 0, 0, axis=0), axis=0)
+    s2 = np.cumsum(np.insert(r ** 2, 0, 0, axis=0), axis=0)
+    w1, w2 = s1[window:] - s1[:-window], s2[window:] - s2[:-window]
+    var = np.maximum((w2 - w1 ** 2 / window) / (window - 1), 0)
+    head = np.full((window - 1,) + r.shape[1:], np.nan)
+    return np.concatenate([head, np.sqrt(var * TRADING_DAYS) * 100])
+
+def max_drawdown(r):
+    """Pire baisse depuis un plus haut, en %, par colonne"""
+    richesse = np.cumprod(1 + np.nan_to_num(np.asarray(r, dtype=float)), axis=0)
+    return ((richesse / np.maximum.accumulate(richesse, axis=0) - 1).min(axis=0)) * 100
+
+def sharpe_ratio(r, rf=RISK_FREE_RATE):
+    excess = np.nanmean(r, axis=0) * TRADING_DAYS - rf / 100
+    vol = np.nanstd(r, axis=0, ddof=1) * np.sqrt(TRADING_DAYS)
+    return np.divide(excess, vol, out=np.full(np.shape(vol), np.nan), where=vol > 0)
+
+def sortino_ratio(r, rf=RISK_FREE_RATE):
+    """Comme Sharpe, mais seule la volatilité des rendements négatifs est pénalisée"""
+    excess = np.nanmean(r, axis=0) * TRADING_DAYS - rf / 100
+    baisse = np.sqrt(np.nanmean(np.minimum(r, 0) ** 2, axis=0) * TRADING_DAYS)
+    return np.divide(excess, baisse, out=np.full(np.shape(baisse), np.nan), where=baisse > 0)
+
+def _pairwise_moments(x, y):
+    """Moyennes, variances et covariances de chaque paire de colonnes (x_i, y_j)
+
+    Seules les dates où les deux séries sont renseignées comptent : tout se
+    ramène à des produits matriciels sur les masques de validité.
+    """
+    mx, my = np.isfinite(x).astype(float), np.isfinite(y).astype(float)
+    x, y = np.nan_to_num(x), np.nan_to_num(y)
+    n = mx.T @ my
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ex, ey = (x.T @ my) / n, (mx.T @ y) / n
+        var_x = (((x ** 2).T @ my) / n) - ex ** 2
+        var_y = ((mx.T @ y ** 2) / n) - ey ** 2
+        cov = (x.T @ y) / n - ex * ey
+    return n, var_x, var_y, cov
+
+def correlation_matrix(r):
+    """Matrice de corrélation complète des colonnes de r (paires complètes uniquement)"""
+    r = np.asarray(r, dtype=float)
+    n, var_x, var_y, cov = _pairwise_moments(r, r)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[n < 2] = np.nan
+    np.fill_diagonal(corr, 1.0)
+    return np.clip(corr, -1, 1)
+
+def beta(r, benchmark_returns):
+    """Bêta de chaque colonne de r face au benchmark"""
+    r = np.asarray(r, dtype=float)
+    b = np.asarray(benchmark_returns, dtype=float).reshape(-1, 1)
+    n, _, var_b, cov = _pairwise_moments(r.reshape(len(r), -1), b)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res = (cov / var_b)[:, 0]
+    res[n[:, 0] < 2] = np.nan
+    return res if r.ndim > 1 else res[0]
+
+def _eur_closes(tickers, usd_tickers, start, benchmark):
+    """Clôtures en EUR (crypto convertie avec le EURUSD=X du jour)"""
+    closes = history_store.load_closes(tickers + [benchmark, FX_TICKER], start)
+    if FX_TICKER in closes.columns:
+        usd = [t for t in usd_tickers if t in closes.columns]
+        closes[usd] = closes[usd].div(closes[FX_TICKER].ffill(), axis=0)
+    return closes
+
+@timed("calcul.risque")
+def analyze_risk(data, period="1y", benchmark=BENCHMARK, download=download_closes):
+    """Volatilité, drawdown, Sharpe/Sortino, bêta et corrélations du portefeuille bourse + crypto
+
+    Les poids viennent des quantités actuelles valorisées au dernier cours
+    connu. Le résultat est mis en cache selon les positions et la version des
+    cours : il n'est recalculé qu'à l'arrivée d'une nouvelle séance.
+    """
+    stocks, _, coins, _ = holdings(data)
+    qty = {**stocks, **coins}
+    if not qty:
+        return None
+    tickers = list(qty)
+    start = history_store.period_start(period)
+    version = history_store.refresh(tickers + [benchmark, FX_TICKER], start, download)
+    key = (tuple(sorted(qty.items())), start, benchmark, version)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    closes = _eur_closes(tickers, list(coins), start, benchmark)
+    presents = [t for t in tickers if t in closes.columns and closes[t].notna().sum() > 1]
+    if not presents:
+        return None
+    dates, r = aligned_returns(closes.reindex(columns=presents + [benchmark]))
+    assets, bench = r[:, :-1], r[:, -1]
+
+    # Poids : quantité x dernier cours ; un titre pas encore coté pèse 0 ce jour-là
+    last = closes[presents].ffill().iloc[-1].to_numpy(dtype=float)
+    valeurs = np.nan_to_num(np.array([qty[t] for t in presents]) * last)
+    if valeurs.sum() <= 0:
+        return None
+    poids = valeurs / valeurs.sum()
+    port = np.nan_to_num(assets) @ poids
+
+    result = {
+        "dates": dates,
+        "tickers": presents,
+        "manquants": [t for t in tickers if t not in presents],
+        "poids": poids,
+        "volatilite": float(annualized_volatility(port)),
+        "volatilite_glissante": rolling_volatility(port),
+        "max_drawdown": float(max_drawdown(port)),
+        "sharpe": float(sharpe_ratio(port)),
+        "sortino": float(sortino_ratio(port)),
+        "beta": float(beta(port, bench)) if np.isfinite(bench).sum() > 1 else None,
+        "benchmark": benchmark,
+        "actifs": pd.DataFrame({
+            "poids": poids * 100,
+            "volatilite": annualized_volatility(assets),
+            "max_drawdown": max_drawdown(assets),
+            "beta": beta(assets, bench),
+        }, index=presents),
+        "correlation": pd.DataFrame(correlation_matrix(assets), index=presents, columns=presents),
+    }
+    with _lock:
+        _cache[key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
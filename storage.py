@@ -0,0 +1,231 @@
+import json
+import os
+import uuid
+
+from db import get_connection, transaction
+from instrumentation import timed
+
+PORTFOLIO_FILE = "portfolio.db"
+# Ancien stockage, migré automatiquement au premier lancement
+LEGACY_JSON_FILE = "portfolio_data.json"
+
+# Listes stockées ligne à ligne ; les autres clés vont dans settings
+COLLECTIONS = ("bourse", "crypto", "dca_orders")
+
+# Champs recalculés par calc_values à chaque exécution, ou recopiés de
+# l'instantané de cours (refresher.apply_snapshot) : inutile de les écrire
+DERIVED_FIELDS = {
+    "position_base", "valeur_actuelle", "gain", "perf",
+    "position_base_usd", "valeur_actuelle_usd", "gain_usd",
+    "position_base_eur", "valeur_actuelle_eur", "gain_eur",
+    "prix_actuel", "prix_actuel_usd", "change_24h",
+}
+# Réglages venant eux aussi de l'instantané (sa source est market_cache)
+DERIVED_SETTINGS = {"taux_usd_eur", "last_update_stocks", "last_update_crypto", "last_update_immo"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (collection, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Le WHERE évite de réécrire une ligne identique
+UPSERT_ITEM = """
+INSERT INTO items (collection, id, position, body) VALUES (?, ?, ?, ?)
+ON CONFLICT(collection, id) DO UPDATE SET position = excluded.position, body = excluded.body
+WHERE items.position != excluded.position OR items.body != excluded.body
+"""
+UPSERT_SETTING = """
+INSERT INTO settings (key, value) VALUES (?, ?)
+ON CONFLICT(key) DO UPDATE SET value = excluded.value WHERE settings.value != excluded.value
+"""
+
+def _conn():
+    return get_connection(PORTFOLIO_FILE, SCHEMA)
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+def get_default_data():
+    return {
+        "bourse": [
+            {"nom": "Streamwide", "ticker": "ALSTW.PA", "qty": 8.652555, "prix_achat": 34.69, "secteur": "Tech", "pays": "France", "dividend_yield": 0},
+            {"nom": "Chevron", "ticker": "CVX", "qty": 3.415936, "prix_achat": 145.85, "secteur": "Énergie", "pays": "USA", "dividend_yield": 3.8},
+            {"nom": "Alphabet (A)", "ticker": "GOOGL", "qty": 1.590988, "prix_achat": 157.77, "secteur": "Tech", "pays": "USA", "dividend_yield": 0.5},
+            {"nom": "Nvidia", "ticker": "NVDA", "qty": 2.120073, "prix_achat": 130.22, "secteur": "Tech", "pays": "USA", "dividend_yield": 0.03},
+            {"nom": "Total Energie", "ticker": "TTE.PA", "qty": 5.136355, "prix_achat": 54.32, "secteur": "Énergie", "pays": "France", "dividend_yield": 5.2},
+            {"nom": "Apple", "ticker": "AAPL", "qty": 1.173637, "prix_achat": 200.25, "secteur": "Tech", "pays": "USA", "dividend_yield": 0.5},
+            {"nom": "Riot Platforms", "ticker": "RIOT", "qty": 19.745854, "prix_achat": 12.12, "secteur": "Crypto Mining", "pays": "USA", "dividend_yield": 0},
+            {"nom": "Physical Silver", "ticker": "PHAG.L", "qty": 3.587989, "prix_achat": 41.55, "secteur": "Métaux", "pays": "UK", "dividend_yield": 0},
+            {"nom": "Microsoft", "ticker": "MSFT", "qty": 0.265737, "prix_achat": 417.79, "secteur": "Tech", "pays": "USA", "dividend_yield": 0.8},
+            {"nom": "Prosus", "ticker": "PRX.AS", "qty": 2, "prix_achat": 57.92, "secteur": "Tech", "pays": "Pays-Bas", "dividend_yield": 0},
+            {"nom": "Air Liquide", "ticker": "AI.PA", "qty": 0.62586, "prix_achat": 160.00, "secteur": "Industrie", "pays": "France", "dividend_yield": 1.9},
+        ],
+        "crypto": [
+            {"nom": "Ethereum", "ticker": "ETH", "qty": 0.21283369, "prix_achat_usd": 2876.50, "is_staked": True, "staking_value_usd": 656.01, "staking_apy": 1.86, "staking_gains_usd": 23.38},
+            {"nom": "Solana", "ticker": "SOL", "qty": 2.23274878, "prix_achat_usd": 129.53, "is_staked": True, "staking_value_usd": 303.05, "staking_apy": 4.13, "staking_gains_usd": 6.38},
+            {"nom": "Bitcoin", "ticker": "BTC", "qty": 0.00271222, "prix_achat_usd": 95890.00, "is_staked": False, "staking_value_usd": 0, "staking_apy": 0, "staking_gains_usd": 0},
+            {"nom": "Polkadot", "ticker": "DOT", "qty": 17.8306141, "prix_achat_usd": 5.71, "is_staked": True, "staking_value_usd": 37.09, "staking_apy": 8.11, "staking_gains_usd": 8.39},
+            {"nom": "Cardano", "ticker": "ADA", "qty": 64.706973, "prix_achat_usd": 1.23, "is_staked": True, "staking_value_usd": 25.20, "staking_apy": 1.52, "staking_gains_usd": 1.49},
+        ],
+        "crypto_extras": {"disponible_usd": 204.20},
+        "dca_orders": [
+            {"crypto": "ETH", "nom": "Ethereum", "montant_eur": 20, "frequence_jours": 14, "prochaine_execution": "2026-01-15"},
+            {"crypto": "SOL", "nom": "Solana", "montant_eur": 15, "frequence_jours": 14, "prochaine_execution": "2026-01-15"},
+            {"crypto": "BTC", "nom": "Bitcoin", "montant_eur": 20, "frequence_jours": 14, "prochaine_execution": "2026-01-15"},
+        ],
+        "immobilier": {"bricks_bloque": 500, "bricks_libre": 1095, "taux_bloque": 0.085, "taux_libre": 0.04, "royaltiz": 200},
+        "last_update_stocks": None,
+        "last_update_crypto": None,
+        "last_update_immo": None,
+        "taux_usd_eur": 0.92
+    }
+
+def persistent_item(item):
+    """Copie d'une position sans les champs dérivés"""
+    return {k: v for k, v in item.items() if k not in DERIVED_FIELDS}
+
+def _rows(data):
+    """État persistant à plat : {(table, clé...): contenu sérialisé}"""
+    rows = {}
+    for collection in COLLECTIONS:
+        for pos, item in enumerate(data.get(collection, [])):
+            # Identifiant stable : une suppression ne décale pas les autres lignes
+            item_id = item.setdefault("id", uuid.uuid4().hex[:12])
+            rows[("items", collection, item_id)] = (pos, _dumps(persistent_item(item)))
+    for k, v in data.items():
+        if k not in COLLECTIONS and k not in DERIVED_SETTINGS:
+            rows[("settings", k)] = _dumps(v)
+    return rows
+
+def _read_rows(conn):
+    rows = {("settings", key): value for key, value in conn.execute("SELECT key, value FROM settings")}
+    for collection, item_id, pos, body in conn.execute("SELECT collection, id, position, body FROM items"):
+        rows[("items", collection, item_id)] = (pos, body)
+    return rows
+
+def _read_current(conn, keys):
+    """Lignes actuelles de la base pour les seules clés données"""
+    rows = {}
+    for k in keys:
+        if k[0] == "items":
+            row = conn.execute("SELECT position, body FROM items WHERE collection = ? AND id = ?", k[1:]).fetchone()
+        else:
+            row = conn.execute("SELECT value FROM settings WHERE key = ?", k[1:]).fetchone()
+        if row:
+            rows[k] = tuple(row) if k[0] == "items" else row[0]
+    return rows
+
+def _delta(old, new):
+    """Lignes à écrire et lignes à supprimer pour passer de old à new"""
+    upserts = {k: v for k, v in new.items() if old.get(k) != v}
+    deletes = [k for k in old if k not in new]
+    return upserts, deletes
+
+def _merge(current, old, new):
+    """Ligne à écrire : les seuls champs changés par la session, appliqués à la ligne actuelle
+
+    Une autre session a pu modifier d'autres champs de la même ligne depuis
+    notre lecture ; ils sont conservés.
+    """
+    if current is None or not isinstance(new, tuple):
+        return new
+    pos = new[0] if old is None or old[0] != new[0] else current[0]
+    body, before, after = json.loads(current[1]), json.loads(old[1]) if old else {}, json.loads(new[1])
+    for k in before.keys() - after.keys():
+        body.pop(k, None)
+    body.update({k: v for k, v in after.items() if k not in before or before[k] != v})
+    return (pos, _dumps(body))
+
+def _apply(conn, upserts, deletes):
+    conn.executemany(UPSERT_ITEM, [(k[1], k[2], v[0], v[1]) for k, v in upserts.items() if k[0] == "items"])
+    conn.executemany(UPSERT_SETTING, [(k[1], v) for k, v in upserts.items() if k[0] == "settings"])
+    conn.executemany("DELETE FROM items WHERE collection = ? AND id = ?", [k[1:] for k in deletes if k[0] == "items"])
+    conn.executemany("DELETE FROM settings WHERE key = ?", [k[1:] for k in deletes if k[0] == "settings"])
+
+def _write(conn, data):
+    _apply(conn, _rows(data), [])
+
+def _parse(rows):
+    # Les champs dérivés écrits par d'anciennes versions sont ignorés (et
+    # retirés à la prochaine écriture de la ligne)
+    data = {k[1]: json.loads(v) for k, v in rows.items() if k[0] == "settings" and k[1] not in DERIVED_SETTINGS}
+    for collection in COLLECTIONS:
+        items = sorted((v for k, v in rows.items() if k[0] == "items" and k[1] == collection), key=lambda v: v[0])
+        data[collection] = [persistent_item(json.loads(body)) for _, body in items]
+    return data
+
+def _load_legacy_json():
+    if not os.path.exists(LEGACY_JSON_FILE):
+        return None
+    try:
+        with open(LEGACY_JSON_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except:
+        return None
+
+def _migrate(conn):
+    """Premier lancement : reprend portfolio_data.json (ou les valeurs par défaut)"""
+    with transaction(conn):
+        # Vérifié sous verrou : deux sessions ne migrent pas en même temps
+        if conn.execute("SELECT 1 FROM settings LIMIT 1").fetchone():
+            return
+        legacy = _load_legacy_json()
+        _write(conn, legacy or get_default_data())
+    if legacy:
+        os.replace(LEGACY_JSON_FILE, LEGACY_JSON_FILE + ".migrated")
+
+@timed("persistance.load")
+def load_data(base=None):
+    """Portefeuille enregistré ; base (dict de la session) reçoit l'état lu, à repasser à save_data"""
+    conn = _conn()
+    if not conn.execute("SELECT 1 FROM settings LIMIT 1").fetchone():
+        _migrate(conn)
+    rows = _read_rows(conn)
+    if base is not None:
+        base["rows"] = rows
+    data = _parse(rows)
+    default = get_default_data()
+    for k in default:
+        if k not in data:
+            data[k] = default[k]
+    return data
+
+@timed("persistance.save")
+def save_data(data, base):
+    """Enregistre ce que la session a changé depuis sa dernière lecture ou écriture
+
+    base est l'état de référence de la session (rempli par load_data, mis à
+    jour ici). Le diff se fait contre lui et non contre la base : les lignes
+    et champs écrits entre-temps par une autre session ne sont ni supprimés ni
+    écrasés. Retourne False (sans aucun accès disque) quand rien n'a changé.
+    """
+    rows = _rows(data)
+    old = base.get("rows", {})
+    upserts, deletes = _delta(old, rows)
+    if not upserts and not deletes:
+        return False
+    conn = _conn()
+    with transaction(conn):
+        # Relu sous verrou : fusion champ par champ avec l'état actuel de chaque ligne
+        current = _read_current(conn, upserts)
+        _apply(conn, {k: _merge(current.get(k), old.get(k), v) for k, v in upserts.items()}, deletes)
+    base["rows"] = rows
+    return True
+
+def reset_data():
+    """Efface le portefeuille enregistré (les valeurs par défaut reviendront au prochain chargement)"""
+    conn = _conn()
+    with transaction(conn):
+        conn.execute("DELETE FROM items")
+        conn.execute("DELETE FROM settings")
+    if os.path.exists(LEGACY_JSON_FILE):
+        os.remove(LEGACY_JSON_FILE)
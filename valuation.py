@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+
+# ============== MOTEUR DE VALORISATION ==============
+
+def _array(items, key, fill=None):
+    """Une colonne numérique extraite des positions (None / absent => NaN, ou fill)"""
+    col = np.array([item.get(key) for item in items], dtype=float)
+    if fill is not None:
+        col[np.isnan(col)] = fill
+    return col
+
+def _group_sum(items, key, values):
+    """Somme de values par valeur de key, dans l'ordre d'apparition"""
+    codes, labels = pd.factorize(np.array([item.get(key, "Autre") for item in items], dtype=object))
+    sums = np.bincount(codes, weights=values, minlength=len(labels)) if len(codes) else np.zeros(0)
+    return dict(zip(labels.tolist(), sums.tolist()))
+
+def _perf(gain, base):
+    return np.divide(gain * 100, base, out=np.zeros_like(gain), where=base > 0)
+
+def _write_back(items, fields):
+    """Recopie les colonnes calculées dans les dicts (lus tels quels par les pages)"""
+    for name, values in fields.items():
+        for item, x in zip(items, values.tolist()):
+            item[name] = x
+
+@timed("calcul.valorisation")
+def value_portfolio(data):
+    """Valorise tout le portefeuille en une passe vectorisée et retourne les agrégats
+
+    Seul le calcul est vectorisé : le modèle reste la liste de dicts de la
+    session (lue par les pages, le journal et storage). Les colonnes sont
+    extraites à chaque appel et les champs dérivés (position_base,
+    valeur_actuelle, gain, perf, *_eur...) recopiés dans chaque position ;
+    aucun tableau n'est conservé d'un rerun à l'autre.
+    """
+    taux = data.get("taux_usd_eur", 0.92)
+
+    # Actions : une colonne NumPy par champ, une ligne par position
+    bourse = data["bourse"]
+    qty = _array(bourse, "qty", fill=0.0)
+    prix_achat = _array(bourse, "prix_achat", fill=0.0)
+    prix_actuel = _array(bourse, "prix_actuel")
+    prix_actuel = np.where(np.isnan(prix_actuel), prix_achat, prix_actuel)
+    position_base = qty * prix_achat
+    valeur = qty * prix_actuel
+    gain = valeur - position_base
+    _write_back(bourse, {"position_base": position_base, "valeur_actuelle": valeur, "gain": gain, "perf": _perf(gain, position_base)})
+
+    # Crypto : la valeur stakée déclarée remplace qty x prix quand elle est renseignée
+    crypto = data["crypto"]
+    c_qty = _array(crypto, "qty", fill=0.0)
+    prix_achat_usd = _array(crypto, "prix_achat_usd", fill=0.0)
+    prix_usd = _array(crypto, "prix_actuel_usd")
+    prix_usd = np.where(np.isnan(prix_usd), prix_achat_usd, prix_usd)
+    staking_value = _array(crypto, "staking_value_usd", fill=0.0)
+    staking_gains = _array(crypto, "staking_gains_usd", fill=0.0)
+    staked = np.array([bool(c.get("is_staked")) for c in crypto], dtype=bool) & (staking_value > 0)
+    base_usd = c_qty * prix_achat_usd
+    valeur_usd = np.where(staked, staking_value, c_qty * prix_usd)
+    gain_usd = valeur_usd - base_usd + staking_gains
+    _write_back(crypto, {
+        "position_base_usd": base_usd, "valeur_actuelle_usd": valeur_usd, "gain_usd": gain_usd,
+        "perf": _perf(gain_usd, base_usd), "position_base_eur": base_usd * taux,
+        "valeur_actuelle_eur": valeur_usd * taux, "gain_eur": gain_usd * taux,
+    })
+
+    # Immobilier : intérêts courus sur 6 mois
+    immo = data["immobilier"]
+    interets_b = immo["bricks_bloque"] * immo["taux_bloque"] * 0.5
+    interets_l = immo["bricks_libre"] * immo["taux_libre"] / 12 * 6
+    immo_investi = immo["bricks_bloque"] + immo["bricks_libre"] + immo["royaltiz"]
+
+    total_bourse_actuel = float(valeur.sum())
+    v = {
+        "taux": taux,
+        "total_bourse_actuel": total_bourse_actuel,
+        "total_bourse_investi": float(position_base.sum()),
+        "gain_bourse": float(gain.sum()),
+        "total_crypto_actuel": float(valeur_usd.sum() * taux) + data["crypto_extras"]["disponible_usd"] * taux,
+        "total_crypto_investi": float(base_usd.sum() * taux),
+        "gain_crypto": float(gain_usd.sum() * taux),
+        "staking_gains_eur": float(staking_gains.sum() * taux),
+        "dividendes_mensuels": float((valeur * _array(bourse, "dividend_yield", fill=0.0)).sum() / 100 / 12),
+        "interets_b": interets_b,
+        "interets_l": interets_l,
+        "immo_val": immo_investi + interets_b + interets_l,
+        "immo_investi": immo_investi,
+        "gain_immo": interets_b + interets_l,
+        "geo": _group_sum(bourse, "pays", valeur),
+        "sec": _group_sum(bourse, "secteur", valeur),
+    }
+    v["patrimoine"] = v["total_bourse_actuel"] + v["total_crypto_actuel"] + v["immo_val"]
+    v["total_investi"] = v["total_bourse_investi"] + v["total_crypto_investi"] + v["immo_investi"]
+    v["gain_total"] = v["gain_bourse"] + v["gain_crypto"] + v["gain_immo"]
+    v["perf_globale"] = (v["gain_total"] / v["total_investi"]) * 100 if v["total_investi"] > 0 else 0
+    v["geo_pct"] = {k: x / total_bourse_actuel * 100 for k, x in v["geo"].items()} if total_bourse_actuel > 0 else {}
+    v["sec_pct"] = {k: x / total_bourse_actuel * 100 for k, x in v["sec"].items()} if total_bourse_actuel > 0 else {}
+    return v
+
+def calc_values(data):
+    value_portfolio(data)
+    return data
+
+@timed("calcul.analyse")
+def analyze_portfolio(data, valuation=None):
+    v = valuation or value_portfolio(data)
+    geo_pct, sec_pct = v["geo_pct"], v["sec_pct"]
+    # Base de calcul historique : l'immobilier compte pour son montant investi
+    total_c = v["total_crypto_actuel"]
+    patrimoine = v["total_bourse_actuel"] + total_c + v["immo_investi"]
+    
+    reco = []
+    usa = geo_pct.get("USA", 0)
+    if usa > 50:
+        reco.append({"cat": "Géo", "prio": "medium", "icon": "🌍", "title": "Surexposition USA", 
+            "detail": f"USA = {usa:.1f}%. Risque de change EUR/USD.",
+            "action": "Diversifier vers Europe/Émergents",
+            "suggestions": [{"nom": "iShares MSCI Europe", "ticker": "IMEU.AS"}, {"nom": "Amundi MSCI EM", "ticker": "AEEM.PA"}]})
+    
+    tech = sec_pct.get("Tech", 0)
+    if tech > 40:
+        reco.append({"cat": "Secteur", "prio": "high", "icon": "💻", "title": "Concentration Tech",
+            "detail": f"Tech = {tech:.1f}%. Volatilité élevée.",
+            "action": "Diversifier vers Santé, Finance, Consommation",
+            "suggestions": [{"nom": "iShares Healthcare", "ticker": "IXJ"}, {"nom": "Sanofi", "ticker": "SAN.PA"}]})
+    
+    if "Santé" not in sec_pct:
+        reco.append({"cat": "Secteur", "prio": "medium", "icon": "🏥", "title": "Absence secteur Santé",
+            "detail": "Secteur défensif absent.",
+            "action": "Allouer 8-12% au secteur Santé",
+            "suggestions": [{"nom": "Johnson & Johnson", "ticker": "JNJ"}, {"nom": "Novo Nordisk", "ticker": "NOVO-B.CO"}]})
+    
+    crypto_pct = total_c / patrimoine * 100 if patrimoine > 0 else 0
+    if crypto_pct > 30:
+        reco.append({"cat": "Allocation", "prio": "high", "icon": "⚠️", "title": "Surexposition Crypto",
+            "detail": f"Crypto = {crypto_pct:.1f}%. Risque élevé.",
+            "action": "Réduire à 20%",
+            "suggestions": [{"nom": "ETF World", "ticker": "CW8.PA"}]})
+    
+    score = 100 - len([r for r in reco if r["prio"]=="high"])*15 - len([r for r in reco if r["prio"]=="medium"])*8
+    return {"score": max(0, min(100, score)), "geo_pct": geo_pct, "sec_pct": sec_pct, "reco": reco}
@@ -0,0 +1,7 @@
+from views import comparer, dashboard, frais, gerer, portefeuille, recommandations, revenus, simulation
+
+# ============== PAGES ==============
+
+# Une page = un module : LABEL (menu), DEPENDS (valeurs dérivées du contexte
+# qu'elle lit) et show(ctx). Seules ses dépendances sont calculées.
+PAGES = {page.LABEL: page for page in (dashboard, portefeuille, gerer, comparer, recommandations, simulation, frais, revenus)}
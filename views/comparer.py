@@ -0,0 +1,237 @@
+import streamlit as st
+import plotly.graph_objects as go
+import pandas as pd
+
+import figures
+import render
+from market_data import get_etf_comparison_data, parse_universe, screen
+
+# ============== PAGE COMPARATEUR ==============
+
+LABEL = "🔍 Comparer"
+DEPENDS = ("data",)
+
+def show(ctx):
+    data = ctx["data"]
+
+    st.markdown('<p class="section-title">🔍 COMPARATEUR ETF & ACTIONS</p>', unsafe_allow_html=True)
+    
+    # Header élégant
+    st.markdown("""
+    <div style="background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%); border-radius: 20px; padding: 25px; margin-bottom: 25px; border: 1px solid #2a4a6a;">
+        <h3 style="color: #4ade80; margin: 0 0 10px 0;">📊 Analysez et comparez vos investissements</h3>
+        <p style="color: #a0aec0; margin: 0;">Comparez autant d'ETF ou d'actions que nécessaire, sur des dates alignées, pour identifier les meilleures opportunités.</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Suggestions populaires avec meilleur design
+    st.markdown("##### 💡 Sélection rapide")
+    suggestions = {
+        "🌍 World": "CW8.PA",
+        "🇺🇸 S&P500": "SPY",
+        "💻 Nasdaq": "QQQ",
+        "🇪🇺 Europe": "MEUD.PA",
+        "🌏 Émergents": "AEEM.PA",
+        "🏥 Santé": "IXJ"
+    }
+    
+    cols = st.columns(6)
+    for i, (name, ticker) in enumerate(suggestions.items()):
+        with cols[i]:
+            st.button(name, key=f"sug_{ticker}", use_container_width=True)
+    
+    st.markdown("")
+    
+    # Zone de saisie améliorée
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        tickers_input = st.text_input("🔎 Tickers à comparer", value="CW8.PA, SPY, QQQ", placeholder="Ex: AAPL, MSFT, GOOGL", label_visibility="collapsed")
+    with col2:
+        period = st.selectbox("Période", ["1mo", "3mo", "6mo", "1y", "2y", "5y"], index=3, label_visibility="collapsed")
+    with col3:
+        include_portfolio = st.checkbox("+ Mon portfolio", value=False)
+    
+    if st.button("🚀 Lancer l'analyse", use_container_width=True, type="primary"):
+        tickers = [t.strip().upper() for t in tickers_input.split(",") if t.strip()]
+        
+        if include_portfolio:
+            portfolio_tickers = [p["ticker"] for p in data["bourse"]]
+            tickers = list(dict.fromkeys(tickers + portfolio_tickers))
+        
+        if tickers:
+            with st.spinner("🔄 Analyse en cours..."):
+                comparison_data = get_etf_comparison_data(tickers, period)
+            
+            if comparison_data:
+                infos = comparison_data["infos"]
+                st.markdown("---")
+                
+                # ===== GRAPHIQUE CORRIGÉ =====
+                st.markdown("#### 📈 Évolution comparative (Base 100)")
+                
+                def build():
+                    fig = go.Figure()
+                    colors = ['#4ade80', '#3b82f6', '#f59e0b', '#ec4899', '#8b5cf6']
+                
+                    # Toutes les courbes partagent le même axe de dates (matrice alignée) ;
+                    # un titre coté plus tard part de 100 à sa première clôture
+                    width = 3 if len(infos) <= len(colors) else 1.5
+                    for i, ticker in enumerate(comparison_data["tickers"]):
+                        d = infos[ticker]
+                        fig.add_trace(go.Scatter(
+                            x=comparison_data["dates"],
+                            y=comparison_data["base100"][:, i],
+                            mode='lines',
+                            name=f"{d['name'][:20]}",
+                            line=dict(color=colors[i % len(colors)], width=width),
+                            hovertemplate=f"<b>{d['name'][:20]}</b><br>Date: %{{x}}<br>Valeur: %{{y:.2f}}<extra></extra>"
+                        ))
+                
+                    fig.update_layout(
+                        height=450,
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        plot_bgcolor='rgba(20,20,32,0.8)',
+                        font=dict(color='#e0e0e0', size=12),
+                        legend=dict(
+                            orientation="h",
+                            yanchor="bottom",
+                            y=1.02,
+                            xanchor="center",
+                            x=0.5,
+                            bgcolor="rgba(20,20,32,0.8)",
+                            bordercolor="#2a2a3a",
+                            borderwidth=1
+                        ),
+                        margin=dict(t=60, b=40, l=60, r=20),
+                        xaxis=dict(
+                            showgrid=True,
+                            gridcolor='rgba(255,255,255,0.05)',
+                            tickfont=dict(size=10)
+                        ),
+                        yaxis=dict(
+                            showgrid=True,
+                            gridcolor='rgba(255,255,255,0.1)',
+                            title="Performance (%)",
+                            tickformat='.0f'
+                        ),
+                        hovermode='x unified'
+                    )
+                    fig.add_hline(y=100, line_dash="dash", line_color="rgba(255,255,255,0.3)", annotation_text="Base 100", annotation_position="right")
+                    return fig
+                st.plotly_chart(figures.cached_figure("comparateur.base100", (comparison_data["dates"], comparison_data["base100"], comparison_data["tickers"], [infos[t]["name"] for t in comparison_data["tickers"]], len(infos)), build), use_container_width=True)
+                recents = [t for t in comparison_data["tickers"] if infos[t]["debut"] > comparison_data["dates"][0]]
+                if recents:
+                    st.caption("⏱️ Historique plus court (base 100 et performance depuis leur première cotation) : "
+                               + " • ".join(f"{infos[t]['name'][:20]} depuis le {infos[t]['debut']}" for t in recents))
+                
+                # ===== TABLEAU COMPARATIF CORRIGÉ =====
+                st.markdown("#### 🏆 Classement")
+                if any(d.get("meta_pending") for d in infos.values()):
+                    st.caption("⏳ Noms, TER et dividendes en cours de chargement : relancez l'analyse dans quelques secondes.")
+                
+                # Tickers déjà classés par performance
+                sorted_data = [(t, infos[t]) for t in comparison_data["tickers"]]
+                best_ticker = sorted_data[0][0] if sorted_data else None
+                
+                # Cartes pour le podium élargi (un seul bloc), tableau pour le classement complet
+                st.markdown(render.ranking_cards(sorted_data[:5], {p["ticker"] for p in data["bourse"]}), unsafe_allow_html=True)
+                
+                if len(sorted_data) > 5:
+                    st.dataframe(pd.DataFrame({
+                        "Nom": [d["name"] for _, d in sorted_data],
+                        "Performance": [d["perf"] for _, d in sorted_data],
+                        "Prix": [d["current_price"] for _, d in sorted_data],
+                        "Devise": [d["currency"] for _, d in sorted_data],
+                        "TER": [d["expense_ratio"] * 100 for _, d in sorted_data],
+                    }, index=pd.Index([t for t, _ in sorted_data], name="Ticker")), height=400, use_container_width=True,
+                        column_config={"Performance": st.column_config.NumberColumn(format="%+.2f%%"), "Prix": st.column_config.NumberColumn(format="%.2f"), "TER": st.column_config.NumberColumn(format="%.2f%%")})
+                
+                # ===== CORRÉLATIONS =====
+                if len(sorted_data) > 1:
+                    st.markdown("#### 🔗 Corrélations (rendements journaliers)")
+                    corr = comparison_data["correlation"]
+                    def build():
+                        fig = go.Figure(go.Heatmap(z=corr.values, x=corr.columns.tolist(), y=corr.index.tolist(), zmin=-1, zmax=1, colorscale="RdBu", reversescale=True, text=corr.values, texttemplate="%{text:.2f}" if len(corr) <= 10 else None))
+                        fig.update_layout(height=max(300, 25 * len(corr)), paper_bgcolor='rgba(0,0,0,0)', font=dict(color='#e0e0e0'), margin=dict(t=10, b=10, l=10, r=10))
+                        return fig
+                    st.plotly_chart(figures.cached_figure("comparateur.correlation", corr, build), use_container_width=True)
+                
+                # ===== ANALYSE =====
+                st.markdown("---")
+                st.markdown("#### 💡 Analyse")
+                
+                best = sorted_data[0]
+                worst = sorted_data[-1]
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown(f"""
+                    <div style="background: linear-gradient(135deg, #0f2a1f 0%, #1a4030 100%); border-radius: 16px; padding: 20px; border: 1px solid #22543d;">
+                        <div style="color: #4ade80; font-size: 12px; text-transform: uppercase; margin-bottom: 8px;">🏆 Meilleur choix</div>
+                        <div style="color: #fff; font-size: 20px; font-weight: 700;">{best[1]['name'][:25]}</div>
+                        <div style="color: #4ade80; font-size: 28px; font-weight: 800; margin-top: 5px;">{best[1]['perf']:+.2f}%</div>
+                    </div>
+                    """, unsafe_allow_html=True)
+                with col2:
+                    st.markdown(f"""
+                    <div style="background: linear-gradient(135deg, #2a1f1f 0%, #402020 100%); border-radius: 16px; padding: 20px; border: 1px solid #543d3d;">
+                        <div style="color: #f87171; font-size: 12px; text-transform: uppercase; margin-bottom: 8px;">📉 Moins performant</div>
+                        <div style="color: #fff; font-size: 20px; font-weight: 700;">{worst[1]['name'][:25]}</div>
+                        <div style="color: #f87171; font-size: 28px; font-weight: 800; margin-top: 5px;">{worst[1]['perf']:+.2f}%</div>
+                    </div>
+                    """, unsafe_allow_html=True)
+                
+                # Suggestion si meilleur n'est pas dans portfolio
+                portfolio_tickers = [p["ticker"] for p in data["bourse"]]
+                if best[0] not in portfolio_tickers:
+                    st.markdown(f"""
+                    <div style="background: linear-gradient(135deg, #1a1a3e 0%, #1e2a4a 100%); border-radius: 16px; padding: 20px; margin-top: 15px; border: 1px solid #3b5998;">
+                        <div style="color: #60a5fa; font-size: 14px;">💡 <strong>Suggestion:</strong> {best[1]['name']} n'est pas dans votre portefeuille. Avec une performance de {best[1]['perf']:+.2f}%, cela pourrait être un ajout intéressant.</div>
+                    </div>
+                    """, unsafe_allow_html=True)
+            else:
+                st.error("❌ Impossible de récupérer les données. Vérifiez les tickers saisis.")
+        else:
+            st.warning("⚠️ Veuillez entrer au moins un ticker.")
+    
+    # ===== SCREENER =====
+    st.markdown("---")
+    st.markdown("#### 🧪 Screener")
+    st.caption("Pour un univers complet (des centaines de tickers) : les résultats s'affichent au fil des téléchargements.")
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        univers_file = st.file_uploader("Fichier univers (CSV ou TXT)", type=["csv", "txt"])
+        univers_text = st.text_area("…ou liste de tickers", placeholder="CW8.PA, SPY, QQQ, IWDA.AS, …", height=80)
+    with col2:
+        screener_period = st.selectbox("Période", ["1mo", "3mo", "6mo", "1y", "2y", "5y"], index=3, key="screener_period")
+        lancer = st.button("🔎 Lancer le screener", use_container_width=True)
+    
+    colonnes = {
+        "perf": st.column_config.NumberColumn("Performance", format="%+.2f%%"),
+        "volatilite": st.column_config.NumberColumn("Volatilité", format="%.1f%%"),
+        "max_drawdown": st.column_config.NumberColumn("Drawdown max", format="%.1f%%"),
+        "prix": st.column_config.NumberColumn("Prix", format="%.2f"),
+        "seances": st.column_config.NumberColumn("Séances"),
+    }
+    if lancer:
+        univers = parse_universe(univers_file.getvalue().decode("utf-8", errors="ignore") if univers_file else univers_text)
+        if not univers:
+            st.warning("⚠️ Aucun ticker dans l'univers.")
+        else:
+            progress = st.progress(0.0, text=f"0/{len(univers)} tickers")
+            tableau = st.empty()
+            resultats, traites = [], 0
+            # Chaque lot terminé est ajouté au classement affiché (tableau virtualisé)
+            for n, lot in screen(univers, screener_period):
+                resultats.append(lot)
+                traites += n
+                classement = pd.concat(resultats).sort_values("perf", ascending=False)
+                tableau.dataframe(classement, height=500, use_container_width=True, column_config=colonnes)
+                progress.progress(traites / len(univers), text=f"{traites}/{len(univers)} tickers traités")
+            progress.empty()
+            st.session_state.screener = pd.concat(resultats).sort_values("perf", ascending=False) if resultats else None
+            manquants = len(univers) - (len(st.session_state.screener) if st.session_state.screener is not None else 0)
+            if manquants:
+                st.caption(f"{manquants} ticker(s) sans données sur la période.")
+    elif st.session_state.get("screener") is not None:
+        st.dataframe(st.session_state.screener, height=500, use_container_width=True, column_config=colonnes)
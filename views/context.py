@@ -0,0 +1,60 @@
+import streamlit as st
+
+import ledger
+import market_calendar
+import refresher
+from valuation import analyze_portfolio, value_portfolio
+from instrumentation import timed
+
+# ============== VALEURS DÉRIVÉES ==============
+
+class Context:
+    """Valeurs dérivées du rerun, calculées au premier accès puis mémorisées
+
+    ctx["valo"] n'est calculé que si la page le déclare ; un second accès
+    dans le même rerun est gratuit.
+    """
+    def __init__(self, providers):
+        self._providers = providers
+        self._values = {}
+
+    def __getitem__(self, name):
+        if name not in self._values:
+            with timed(f"contexte.{name}"):
+                self._values[name] = self._providers[name](self)
+        return self._values[name]
+
+def _data(ctx):
+    # Quantités et prix d'achat moyens dérivés du journal (achats DCA du worker compris),
+    # derniers cours de l'instantané (disque seulement)
+    data = ledger.sync_portfolio(st.session_state.data)
+    return refresher.apply_snapshot(data, ctx["snapshot"])
+
+# Chiffres de l'en-tête, gardés d'une page à l'autre
+RESUME_KEYS = ("patrimoine", "gain_total", "perf_globale")
+
+def _valo(ctx):
+    valo = value_portfolio(ctx["data"])
+    st.session_state.derniere_valo = {k: valo[k] for k in RESUME_KEYS}
+    return valo
+
+def _resume(ctx):
+    """Dernière valorisation de la session ; à défaut, valorisation des cours de l'instantané"""
+    last = st.session_state.get("derniere_valo")
+    if last:
+        return last
+    valo = value_portfolio(ctx["data"])
+    return {k: valo[k] for k in RESUME_KEYS}
+
+PROVIDERS = {
+    "snapshot": lambda ctx: refresher.latest_snapshot(),
+    "data": _data,
+    "valo": _valo,
+    "analysis": lambda ctx: analyze_portfolio(ctx["data"], ctx["valo"]),
+    # Place par place (fuseau, jours fériés)
+    "marches": lambda ctx: market_calendar.market_status([p["ticker"] for p in ctx["data"]["bourse"]]),
+    "resume": _resume,
+}
+
+def new_context():
+    return Context(PROVIDERS)
@@ -0,0 +1,104 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+
+import figures
+import render
+from nav import load_nav, estimate_nav, drawdown
+
+# ============== PAGE TABLEAU DE BORD ==============
+
+LABEL = "📊 Dashboard"
+DEPENDS = ("data", "valo", "analysis")
+
+def show(ctx):
+    data, valo = ctx["data"], ctx["valo"]
+    total_bourse_actuel, total_crypto_actuel, immo_val = valo["total_bourse_actuel"], valo["total_crypto_actuel"], valo["immo_val"]
+    gain_bourse, gain_crypto, gain_immo = valo["gain_bourse"], valo["gain_crypto"], valo["gain_immo"]
+    patrimoine, total_investi, gain_total, perf_globale = valo["patrimoine"], valo["total_investi"], valo["gain_total"], valo["perf_globale"]
+    perf_symbol = "+" if gain_total > 0 else ""
+
+    st.markdown('<p class="section-title">📊 TABLEAU DE BORD</p>', unsafe_allow_html=True)
+    analysis = ctx["analysis"]
+    
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.markdown(f'<div class="dash-card"><div class="dash-card-title">💰 INVESTI</div><div class="dash-card-value">{total_investi:,.0f}€</div></div>', unsafe_allow_html=True)
+    with col2:
+        gc = "change-positive" if gain_total > 0 else "change-negative"
+        st.markdown(f'<div class="dash-card"><div class="dash-card-title">📈 GAIN/PERTE</div><div class="dash-card-value {gc}">{perf_symbol}{gain_total:,.2f}€</div></div>', unsafe_allow_html=True)
+    with col3:
+        sc = "#4ade80" if analysis["score"] >= 70 else "#fbbf24" if analysis["score"] >= 50 else "#f87171"
+        st.markdown(f'<div class="dash-card"><div class="dash-card-title">🎯 SCORE</div><div class="dash-card-value" style="color:{sc};">{analysis["score"]}/100</div></div>', unsafe_allow_html=True)
+    with col4:
+        perf_pct_class = "change-positive" if perf_globale > 0 else "change-negative"
+        st.markdown(f'<div class="dash-card"><div class="dash-card-title">📊 PERFORMANCE</div><div class="dash-card-value {perf_pct_class}">{perf_symbol}{perf_globale:.2f}%</div></div>', unsafe_allow_html=True)
+    with col5:
+        dca_mois = sum(o["montant_eur"] * 30.44 / max(o["frequence_jours"], 1) for o in data["dca_orders"])
+        st.markdown(f'<div class="dash-card"><div class="dash-card-title">🔄 DCA/MOIS</div><div class="dash-card-value" style="color:#3b82f6;">{dca_mois:.0f}€</div></div>', unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    # Répartition
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        st.markdown("#### 🥧 Répartition du patrimoine")
+        def build():
+            fig = go.Figure(data=[go.Pie(labels=['Bourse', 'Crypto', 'Immo'], values=[total_bourse_actuel, total_crypto_actuel, immo_val], hole=.7, marker_colors=['#3b82f6', '#f59e0b', '#10b981'], textinfo='percent')])
+            fig.update_layout(height=300, paper_bgcolor='rgba(0,0,0,0)', font=dict(color='#fff'), showlegend=True, legend=dict(orientation="h", y=-0.1, x=0.5, xanchor="center"), margin=dict(t=10, b=40, l=10, r=10))
+            fig.add_annotation(text=f"{patrimoine:,.0f}€", x=0.5, y=0.5, font_size=16, font_color="white", showarrow=False)
+            return fig
+        st.plotly_chart(figures.cached_figure("repartition", (total_bourse_actuel, total_crypto_actuel, immo_val, patrimoine), build), use_container_width=True)
+    
+    with col2:
+        st.markdown("#### 📊 Détail par catégorie")
+        st.markdown(f"""
+        <div class="section-card">
+            <div class="detail-row"><span class="detail-label">📈 Bourse</span><span class="detail-value">{total_bourse_actuel:,.2f}€ <span style="color:{'#4ade80' if gain_bourse > 0 else '#f87171'};">({'+' if gain_bourse > 0 else ''}{gain_bourse:,.2f}€)</span></span></div>
+            <div class="detail-row"><span class="detail-label">₿ Crypto</span><span class="detail-value">{total_crypto_actuel:,.2f}€ <span style="color:{'#4ade80' if gain_crypto > 0 else '#f87171'};">({'+' if gain_crypto > 0 else ''}{gain_crypto:,.2f}€)</span></span></div>
+            <div class="detail-row"><span class="detail-label">🏠 Immobilier</span><span class="detail-value">{immo_val:,.2f}€ <span style="color:#4ade80;">(+{gain_immo:,.2f}€)</span></span></div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Top/Flop/DCA
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown("#### 🏆 Top Performers")
+        st.markdown(render.performer_rows(sorted(data["bourse"], key=lambda x: x.get("perf", 0), reverse=True)[:5]), unsafe_allow_html=True)
+    with col2:
+        st.markdown("#### 📉 Flop Performers")
+        st.markdown(render.performer_rows(sorted(data["bourse"], key=lambda x: x.get("perf", 0))[:5]), unsafe_allow_html=True)
+    with col3:
+        st.markdown("#### 🔄 Prochains DCA")
+        st.markdown(render.dca_cards(data["dca_orders"]), unsafe_allow_html=True)
+    
+    # Historique : journées enregistrées par le worker de cours, précédées d'une estimation
+    st.markdown("---")
+    st.markdown("#### 📈 Historique du patrimoine")
+    hist = load_nav()
+    estimation = estimate_nav(data, hist.index.min() if len(hist) else None)
+    serie = pd.concat([estimation, hist]) if len(estimation) else hist
+    if len(serie) < 2:
+        st.info("Historique indisponible pour le moment (cours historiques injoignables)")
+    else:
+        dd = drawdown(serie["total"])
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            def build():
+                fig = go.Figure()
+                if len(estimation):
+                    fig.add_trace(go.Scatter(x=estimation.index, y=estimation["total"], name="Total (estimation)", line=dict(color="#9ca3af", width=2, dash="dot")))
+                fig.add_trace(go.Scatter(x=hist.index, y=hist["total"], name="Total", line=dict(color="#fff", width=2)))
+                fig.add_trace(go.Scatter(x=serie.index, y=serie["bourse"], name="Bourse", line=dict(color="#3b82f6", width=1)))
+                fig.add_trace(go.Scatter(x=serie.index, y=serie["crypto"], name="Crypto", line=dict(color="#f59e0b", width=1)))
+                fig.update_layout(height=300, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color='#fff'), legend=dict(orientation="h", y=-0.15), margin=dict(t=10, b=40, l=10, r=10), yaxis=dict(gridcolor='rgba(255,255,255,0.05)'))
+                return fig
+            st.plotly_chart(figures.cached_figure("nav", (estimation, hist), build), use_container_width=True)
+        with col2:
+            def build():
+                fig = go.Figure(go.Scatter(x=serie.index, y=dd, fill='tozeroy', line=dict(color="#f87171", width=1)))
+                fig.update_layout(height=300, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color='#fff'), margin=dict(t=10, b=40, l=10, r=10), yaxis=dict(gridcolor='rgba(255,255,255,0.05)', ticksuffix="%"), title=dict(text=f"Drawdown (max {dd.min():.1f}%)", font=dict(size=13)))
+                return fig
+            st.plotly_chart(figures.cached_figure("drawdown", (serie.index, dd), build), use_container_width=True)
+        st.caption("Bourse + crypto, l'immobilier n'est pas inclus. Pointillés : estimation avec les quantités actuelles "
+                   "(achats et ventes passés ignorés), jamais enregistrée ; trait plein : valeurs enregistrées jour après jour.")
@@ -0,0 +1,265 @@
+import streamlit as st
+import plotly.graph_objects as go
+
+import figures
+from projection import project
+
+# ============== PAGE FRAIS ==============
+
+LABEL = "💰 Frais"
+DEPENDS = ("data", "valo")
+
+def show(ctx):
+    data, valo = ctx["data"], ctx["valo"]
+    total_bourse_actuel = valo["total_bourse_actuel"]
+
+    st.markdown('<p class="section-title">💰 ANALYSEUR DE FRAIS</p>', unsafe_allow_html=True)
+    
+    # Calculer les frais estimés pour chaque position
+    frais_positions = []
+    for p in data["bourse"]:
+        # Estimer les frais selon le type
+        if "ETF" in p.get("secteur", ""):
+            ter = 0.002  # 0.20% pour ETF
+        elif p.get("secteur") == "Tech":
+            ter = 0.0  # Actions individuelles = pas de TER
+        else:
+            ter = 0.0
+        
+        frais_annuel = p.get("valeur_actuelle", 0) * ter
+        frais_positions.append({
+            "nom": p["nom"],
+            "ticker": p["ticker"],
+            "valeur": p.get("valeur_actuelle", 0),
+            "ter": ter,
+            "frais_an": frais_annuel,
+            "secteur": p.get("secteur", "")
+        })
+    
+    # Frais totaux
+    frais_ter_an = sum(f["frais_an"] for f in frais_positions)
+    frais_courtage_estim = total_bourse_actuel * 0.001  # 0.1% de spread estimé
+    frais_totaux_an = frais_ter_an + frais_courtage_estim
+    frais_30_ans = frais_totaux_an * 30 * 1.05  # Avec croissance
+    
+    # ETF recommandés bas coût
+    etf_recommandes = [
+        {"nom": "Amundi MSCI World", "ticker": "CW8.PA", "ter": 0.0012, "desc": "World diversifié", "perf_5y": "+85%"},
+        {"nom": "Vanguard S&P 500", "ticker": "VUSA.AS", "ter": 0.0007, "desc": "USA grandes caps", "perf_5y": "+95%"},
+        {"nom": "iShares Core MSCI Europe", "ticker": "IMEU.AS", "ter": 0.0012, "desc": "Europe diversifié", "perf_5y": "+45%"},
+        {"nom": "Amundi MSCI Emerging", "ticker": "AEEM.PA", "ter": 0.0014, "desc": "Marchés émergents", "perf_5y": "+25%"},
+        {"nom": "Xtrackers MSCI World", "ticker": "XDWD.DE", "ter": 0.0019, "desc": "World accumulation", "perf_5y": "+82%"},
+        {"nom": "Lyxor Nasdaq 100", "ticker": "PUST.PA", "ter": 0.0022, "desc": "Tech US", "perf_5y": "+140%"},
+    ]
+    
+    # Header avec stats principales
+    st.markdown("""
+    <div style="background: linear-gradient(135deg, rgba(248, 113, 113, 0.1) 0%, rgba(239, 68, 68, 0.05) 100%); border-radius: 24px; padding: 30px; margin-bottom: 30px; border: 1px solid rgba(248, 113, 113, 0.2);">
+        <div style="text-align: center;">
+            <div style="color: #f87171; font-size: 11px; letter-spacing: 3px; margin-bottom: 10px;">⚠️ IMPACT DES FRAIS SUR 30 ANS</div>
+            <div style="font-size: 64px; font-weight: 900; color: #f87171; letter-spacing: -3px;">""" + f"{frais_30_ans:,.0f}€" + """</div>
+            <div style="color: #a0aec0; margin-top: 10px;">Soit """ + f"{frais_totaux_an:,.0f}€" + """/an en moyenne</div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # 3 colonnes de stats
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown(f"""
+        <div class="mini-card" style="border-color: rgba(248, 113, 113, 0.3);">
+            <div style="font-size: 28px;">📊</div>
+            <div class="mini-value" style="color: #f87171;">{frais_ter_an:,.2f}€</div>
+            <div class="mini-title">FRAIS DE GESTION/AN</div>
+        </div>
+        """, unsafe_allow_html=True)
+    with col2:
+        ter_moyen = (frais_ter_an / total_bourse_actuel * 100) if total_bourse_actuel > 0 else 0
+        st.markdown(f"""
+        <div class="mini-card" style="border-color: rgba(251, 191, 36, 0.3);">
+            <div style="font-size: 28px;">📈</div>
+            <div class="mini-value" style="color: #fbbf24;">{ter_moyen:.2f}%</div>
+            <div class="mini-title">TER MOYEN PONDÉRÉ</div>
+        </div>
+        """, unsafe_allow_html=True)
+    with col3:
+        eco_potentielle = frais_30_ans * 0.6
+        st.markdown(f"""
+        <div class="mini-card" style="border-color: rgba(74, 222, 128, 0.3);">
+            <div style="font-size: 28px;">💰</div>
+            <div class="mini-value" style="color: #4ade80;">{eco_potentielle:,.0f}€</div>
+            <div class="mini-title">ÉCONOMIE POSSIBLE</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    # Analyse de ton portefeuille
+    st.markdown("### 🔍 Analyse de ton portefeuille")
+    
+    # Identifier les positions coûteuses
+    actions_indiv = [p for p in data["bourse"] if "ETF" not in p.get("secteur", "")]
+    etf_existants = [p for p in data["bourse"] if "ETF" in p.get("secteur", "")]
+    
+    # Recommandations personnalisées
+    recommandations = []
+    
+    # Check concentration actions individuelles
+    total_actions = sum(p.get("valeur_actuelle", 0) for p in actions_indiv)
+    pct_actions = (total_actions / total_bourse_actuel * 100) if total_bourse_actuel > 0 else 0
+    
+    if pct_actions > 60:
+        recommandations.append({
+            "type": "high",
+            "icon": "⚠️",
+            "titre": "Forte concentration en actions individuelles",
+            "detail": f"{pct_actions:.0f}% de ton portefeuille est en actions individuelles. Les ETF offrent une diversification à moindre coût.",
+            "action": "Considère de basculer une partie vers des ETF World ou S&P 500",
+            "etf": ["CW8.PA", "VUSA.AS"]
+        })
+    
+    # Check si pas d'ETF World
+    has_world = any("World" in p["nom"] or "MSCI" in p["nom"] for p in data["bourse"])
+    if not has_world:
+        recommandations.append({
+            "type": "medium",
+            "icon": "🌍",
+            "titre": "Absence d'ETF World",
+            "detail": "Un ETF World offre une diversification mondiale avec un TER très bas (~0.12-0.20%).",
+            "action": "L'ETF CW8.PA (Amundi MSCI World) est éligible PEA avec 0.12% de frais",
+            "etf": ["CW8.PA", "XDWD.DE"]
+        })
+    
+    # Check exposition sectorielle
+    tech_positions = [p for p in data["bourse"] if p.get("secteur") == "Tech"]
+    total_tech = sum(p.get("valeur_actuelle", 0) for p in tech_positions)
+    pct_tech = (total_tech / total_bourse_actuel * 100) if total_bourse_actuel > 0 else 0
+    
+    if pct_tech > 40 and len(tech_positions) > 3:
+        recommandations.append({
+            "type": "medium",
+            "icon": "💻",
+            "titre": "Concentration Tech via actions individuelles",
+            "detail": f"Tu as {len(tech_positions)} actions tech représentant {pct_tech:.0f}% du portefeuille. Un ETF Nasdaq pourrait simplifier.",
+            "action": "Le Lyxor Nasdaq 100 (PUST.PA) offre une exposition tech diversifiée",
+            "etf": ["PUST.PA", "QQQ"]
+        })
+    
+    # Afficher les recommandations
+    if recommandations:
+        for reco in recommandations:
+            border_color = "#f87171" if reco["type"] == "high" else "#fbbf24" if reco["type"] == "medium" else "#4ade80"
+            st.markdown(f"""
+            <div style="background: linear-gradient(145deg, rgba(20, 20, 32, 0.9) 0%, rgba(26, 26, 40, 0.9) 100%); border-radius: 16px; padding: 22px; margin-bottom: 15px; border-left: 4px solid {border_color};">
+                <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 12px;">
+                    <span style="font-size: 24px;">{reco["icon"]}</span>
+                    <span style="color: #fff; font-weight: 700; font-size: 16px;">{reco["titre"]}</span>
+                </div>
+                <p style="color: #a0aec0; margin-bottom: 12px; font-size: 14px;">{reco["detail"]}</p>
+                <p style="color: #4ade80; font-weight: 600; font-size: 13px;">💡 {reco["action"]}</p>
+            </div>
+            """, unsafe_allow_html=True)
+    else:
+        st.success("✅ Ton portefeuille semble bien optimisé en termes de frais !")
+    
+    st.markdown("---")
+    
+    # ETF Recommandés
+    st.markdown("### 🏆 ETF à bas coût recommandés")
+    st.markdown("<p style='color: #6b7280; margin-bottom: 20px;'>Sélection d'ETF avec les frais les plus compétitifs du marché</p>", unsafe_allow_html=True)
+    
+    cols = st.columns(3)
+    for i, etf in enumerate(etf_recommandes):
+        with cols[i % 3]:
+            ter_color = "#4ade80" if etf["ter"] < 0.0015 else "#fbbf24" if etf["ter"] < 0.0025 else "#f87171"
+            st.markdown(f"""
+            <div style="background: linear-gradient(145deg, rgba(20, 20, 32, 0.9) 0%, rgba(26, 26, 40, 0.9) 100%); border-radius: 16px; padding: 20px; margin-bottom: 15px; border: 1px solid rgba(255,255,255,0.05); transition: all 0.3s;">
+                <div style="display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 12px;">
+                    <div>
+                        <div style="color: #fff; font-weight: 700; font-size: 14px;">{etf["nom"]}</div>
+                        <div style="color: #6b7280; font-size: 11px;">{etf["ticker"]}</div>
+                    </div>
+                    <div style="background: {ter_color}20; color: {ter_color}; padding: 4px 10px; border-radius: 8px; font-size: 12px; font-weight: 700;">
+                        {etf["ter"]*100:.2f}%
+                    </div>
+                </div>
+                <div style="color: #a0aec0; font-size: 12px; margin-bottom: 8px;">{etf["desc"]}</div>
+                <div style="color: #4ade80; font-size: 13px; font-weight: 600;">Perf 5 ans: {etf["perf_5y"]}</div>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    # Comparatif frais
+    st.markdown("### 📊 Impact des frais sur 30 ans")
+    
+    # Simulation graphique
+    capital_init = total_bourse_actuel if total_bourse_actuel > 0 else 10000
+    apport_mensuel = 200
+    rendement = 0.07  # 7% annuel
+    
+    annees = list(range(0, 31))
+    
+    # Scénario actuel (frais moyens) et optimisé (0.12% TER), en pas annuels
+    ter_actuel = ter_moyen / 100 if ter_moyen > 0 else 0.02
+    ter_opti = 0.0012
+    values_actuel, values_opti = project(capital_init, apport_mensuel * 12, [rendement - ter_actuel, rendement - ter_opti], 30)
+    
+    def build():
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=annees, y=values_opti, mode='lines', name='ETF bas coût (0.12%)',
+            line=dict(color='#4ade80', width=3),
+            fill='tonexty', fillcolor='rgba(74,222,128,0.1)'
+        ))
+        fig.add_trace(go.Scatter(
+            x=annees, y=values_actuel, mode='lines', name=f'Situation actuelle ({ter_actuel*100:.2f}%)',
+            line=dict(color='#f87171', width=3)
+        ))
+    
+        fig.update_layout(
+            height=400,
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(20,20,32,0.8)',
+            font=dict(color='#e0e0e0'),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+            margin=dict(t=50, b=40, l=60, r=20),
+            xaxis=dict(title="Années", showgrid=False),
+            yaxis=dict(title="Valeur (€)", showgrid=True, gridcolor='rgba(255,255,255,0.05)', tickformat=',.0f'),
+            hovermode='x unified'
+        )
+        return fig
+    st.plotly_chart(figures.cached_figure("frais", (annees, values_opti, values_actuel, ter_actuel), build), use_container_width=True)
+    
+    # Différence finale
+    diff = values_opti[-1] - values_actuel[-1]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown(f"""
+        <div class="mini-card" style="border-color: rgba(74, 222, 128, 0.3);">
+            <div style="color: #6b7280; font-size: 10px; margin-bottom: 5px;">AVEC ETF BAS COÛT</div>
+            <div style="color: #4ade80; font-size: 24px; font-weight: 800;">{values_opti[-1]:,.0f}€</div>
+        </div>
+        """, unsafe_allow_html=True)
+    with col2:
+        st.markdown(f"""
+        <div class="mini-card" style="border-color: rgba(248, 113, 113, 0.3);">
+            <div style="color: #6b7280; font-size: 10px; margin-bottom: 5px;">SITUATION ACTUELLE</div>
+            <div style="color: #f87171; font-size: 24px; font-weight: 800;">{values_actuel[-1]:,.0f}€</div>
+        </div>
+        """, unsafe_allow_html=True)
+    with col3:
+        st.markdown(f"""
+        <div class="mini-card" style="border-color: rgba(74, 222, 128, 0.5); background: rgba(74, 222, 128, 0.1);">
+            <div style="color: #6b7280; font-size: 10px; margin-bottom: 5px;">💰 ÉCONOMIE</div>
+            <div style="color: #4ade80; font-size: 24px; font-weight: 800;">+{diff:,.0f}€</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown(f"""
+    <div style="background: linear-gradient(135deg, rgba(74, 222, 128, 0.1) 0%, rgba(34, 197, 94, 0.05) 100%); border-radius: 16px; padding: 20px; margin-top: 20px; border: 1px solid rgba(74, 222, 128, 0.2); text-align: center;">
+        <p style="color: #4ade80; font-size: 16px; font-weight: 600; margin: 0;">
+            💡 En optimisant tes frais, tu pourrais gagner <strong>{diff:,.0f}€</strong> supplémentaires sur 30 ans !
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
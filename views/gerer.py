@@ -0,0 +1,180 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+
+import ledger
+from storage import save_data
+
+# ============== PAGE GÉRER ==============
+
+LABEL = "➕ Gérer"
+DEPENDS = ("data",)
+
+def show(ctx):
+    data = ctx["data"]
+    immo = data["immobilier"]
+
+    st.markdown('<p class="section-title">➕ GÉRER POSITIONS</p>', unsafe_allow_html=True)
+    tabs = st.tabs(["📈 Action", "₿ Crypto", "🔄 DCA", "✏️ Staking", "🏠 Immo", "📒 Journal", "🗑️ Suppr"])
+    
+    with tabs[0]:
+        with st.form("add_stock"):
+            c1, c2 = st.columns(2)
+            with c1:
+                nom = st.text_input("Nom*")
+                ticker = st.text_input("Ticker Yahoo Finance*")
+                qty = st.number_input("Quantité*", min_value=0.0, format="%.6f")
+            with c2:
+                prix = st.number_input("Prix achat €*", min_value=0.0)
+                secteur = st.selectbox("Secteur", ["Tech", "Énergie", "Finance", "Santé", "Industrie", "ETF Europe", "ETF Émergents", "ETF World", "Métaux", "Autre"])
+                pays = st.selectbox("Pays", ["USA", "France", "Europe", "UK", "Chine", "Autre"])
+            div = st.number_input("Dividende %", min_value=0.0, max_value=20.0)
+            if st.form_submit_button("➕ Ajouter"):
+                if nom and ticker and qty > 0 and prix > 0:
+                    # Déjà détenue : l'achat renforce la position existante via le journal
+                    ledger.record("bourse", ticker, "achat", qty, prix)
+                    if not any(p["ticker"].upper() == ticker.upper() for p in data["bourse"]):
+                        data["bourse"].append({"nom": nom, "ticker": ticker.upper(), "qty": qty, "prix_achat": prix, "secteur": secteur, "pays": pays, "dividend_yield": div})
+                    ledger.sync_portfolio(data)
+                    save_data(data, st.session_state.base_persistee)
+                    st.success(f"✅ {nom} ajoutée!")
+                    st.rerun()
+    
+    with tabs[1]:
+        with st.form("add_crypto"):
+            c1, c2 = st.columns(2)
+            with c1:
+                nom = st.text_input("Nom*", key="cn")
+                ticker = st.text_input("Ticker (BTC, ETH...)*", key="ct")
+                qty = st.number_input("Quantité*", min_value=0.0, format="%.8f", key="cq")
+            with c2:
+                prix = st.number_input("Prix achat USD*", min_value=0.0, key="cp")
+                staked = st.checkbox("Position stakée?")
+                apy = st.number_input("APY %", min_value=0.0, max_value=100.0) if staked else 0
+            if st.form_submit_button("➕ Ajouter"):
+                if nom and ticker and qty > 0 and prix > 0:
+                    ledger.record("crypto", ticker, "achat", qty, prix)
+                    if not any(c["ticker"].upper() == ticker.upper() for c in data["crypto"]):
+                        data["crypto"].append({"nom": nom, "ticker": ticker.upper(), "qty": qty, "prix_achat_usd": prix, "is_staked": staked, "staking_value_usd": qty*prix, "staking_apy": apy, "staking_gains_usd": 0})
+                    ledger.sync_portfolio(data)
+                    save_data(data, st.session_state.base_persistee)
+                    st.success(f"✅ {nom} ajoutée!")
+                    st.rerun()
+    
+    with tabs[2]:
+        st.markdown("**Ordres DCA:**")
+        for i, o in enumerate(data["dca_orders"]):
+            c1, c2, c3 = st.columns([2, 2, 1])
+            with c1:
+                data["dca_orders"][i]["montant_eur"] = st.number_input(o["crypto"], value=o["montant_eur"], key=f"dca_m_{i}")
+            with c2:
+                nd = st.date_input("Prochain", value=datetime.strptime(o["prochaine_execution"], "%Y-%m-%d"), key=f"dca_d_{i}")
+                data["dca_orders"][i]["prochaine_execution"] = nd.strftime("%Y-%m-%d")
+        st.markdown("**Disponible:**")
+        data["crypto_extras"]["disponible_usd"] = st.number_input("USD disponible", value=data["crypto_extras"]["disponible_usd"])
+        if st.button("💾 Sauvegarder"):
+            save_data(data, st.session_state.base_persistee)
+            st.success("Sauvegardé!")
+            st.rerun()
+    
+    with tabs[3]:
+        st.markdown("**Valeurs de staking (mettre à jour depuis votre plateforme):**")
+        for i, c in enumerate(data["crypto"]):
+            if c.get("is_staked"):
+                st.markdown(f"**{c['nom']}**")
+                c1, c2, c3 = st.columns(3)
+                with c1:
+                    c["staking_value_usd"] = st.number_input("Valeur USD", value=c.get("staking_value_usd", 0), key=f"sv_{i}")
+                with c2:
+                    c["staking_apy"] = st.number_input("APY %", value=c.get("staking_apy", 0), key=f"sa_{i}")
+                with c3:
+                    c["staking_gains_usd"] = st.number_input("Gains USD", value=c.get("staking_gains_usd", 0), key=f"sg_{i}")
+        if st.button("💾 Sauvegarder Staking"):
+            save_data(data, st.session_state.base_persistee)
+            st.success("Sauvegardé!")
+            st.rerun()
+    
+    with tabs[4]:
+        st.markdown("**Positions immobilières:**")
+        c1, c2 = st.columns(2)
+        with c1:
+            immo["bricks_bloque"] = st.number_input("Bricks Bloqué €", value=immo["bricks_bloque"])
+            immo["taux_bloque"] = st.number_input("Taux Bloqué %", value=immo["taux_bloque"]*100) / 100
+        with c2:
+            immo["bricks_libre"] = st.number_input("Bricks Libre €", value=immo["bricks_libre"])
+            immo["taux_libre"] = st.number_input("Taux Libre %", value=immo["taux_libre"]*100) / 100
+        immo["royaltiz"] = st.number_input("Royaltiz €", value=immo["royaltiz"])
+        if st.button("💾 Sauvegarder Immo"):
+            save_data(data, st.session_state.base_persistee)
+            st.success("Sauvegardé!")
+            st.rerun()
+    
+    with tabs[5]:
+        st.markdown("**Enregistrer une opération** (prix unitaire en € pour les actions, en $ pour les cryptos)")
+        with st.form("add_operation"):
+            c1, c2, c3 = st.columns(3)
+            with c1:
+                classe = st.selectbox("Classe", ledger.CLASSES)
+                op_ticker = st.text_input("Ticker*")
+            with c2:
+                op_type = st.selectbox("Opération", ledger.TYPES)
+                op_date = st.date_input("Date", value=datetime.now())
+            with c3:
+                op_qty = st.number_input("Quantité*", min_value=0.0, format="%.8f")
+                op_prix = st.number_input("Prix unitaire* (dividende par action)", min_value=0.0, format="%.4f")
+                op_frais = st.number_input("Frais", min_value=0.0)
+            if st.form_submit_button("📒 Enregistrer"):
+                if op_ticker and op_qty > 0:
+                    try:
+                        ledger.record(classe, op_ticker, op_type, op_qty, op_prix, op_frais, day=op_date)
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+                    else:
+                        ledger.sync_portfolio(data)
+                        save_data(data, st.session_state.base_persistee)
+                        st.success(f"✅ {op_type} {op_ticker.upper()} enregistré")
+                        st.rerun()
+
+        # P&L FIFO : réalisé et revenus depuis le journal, latent au dernier cours connu
+        prix_actuels = {("bourse", p["ticker"].upper()): p.get("prix_actuel") for p in data["bourse"]}
+        prix_actuels.update({("crypto", c["ticker"].upper()): c.get("prix_actuel_usd") for c in data["crypto"]})
+        resume = [{"Classe": k[0], "Ticker": k[1], "Quantité": p["qty"], "PRU": p["pru"], "Coût restant": p["cout"],
+                   "Latent": p["latent"], "Réalisé": p["realise"], "Revenus": p["revenus"], "Opérations": p["operations"]}
+                  for k, p in sorted(ledger.pnl(prix_actuels).items())]
+        if resume:
+            st.dataframe(pd.DataFrame(resume), hide_index=True, use_container_width=True, column_config={
+                c: st.column_config.NumberColumn(format="%.2f") for c in ("PRU", "Coût restant", "Latent", "Réalisé", "Revenus")})
+        st.markdown("**Dernières opérations:**")
+        st.dataframe(pd.DataFrame(ledger.history(limit=200)), hide_index=True, use_container_width=True)
+
+    with tabs[6]:
+        st.warning("⚠️ Actions irréversibles!")
+        vendue = st.radio("Motif", ["Erreur de saisie (sans vente)", "Position vendue (vente au dernier cours)"], horizontal=True,
+                          help="Une correction retire la position du journal sans P&L ; une vente y enregistre le réalisé") != "Erreur de saisie (sans vente)"
+
+        def retirer(classe, ligne, prix):
+            # Seulement la quantité de la ligne si le ticker en a d'autres
+            autres = sum(x["ticker"].upper() == ligne["ticker"].upper() for x in data[classe]) > 1
+            qty = ligne["qty"] if autres else None
+            if vendue:
+                ledger.close(classe, ligne["ticker"], prix, qty)
+            else:
+                ledger.remove(classe, ligne["ticker"], qty)
+
+        c1, c2 = st.columns(2)
+        with c1:
+            st.markdown("**Actions:**")
+            for i, p in enumerate(data["bourse"]):
+                if st.button(f"🗑️ {p['nom']}", key=f"ds_{i}"):
+                    retirer("bourse", p, p.get("prix_actuel", p["prix_achat"]))
+                    data["bourse"].pop(i)
+                    save_data(data, st.session_state.base_persistee)
+                    st.rerun()
+        with c2:
+            st.markdown("**Cryptos:**")
+            for i, c in enumerate(data["crypto"]):
+                if st.button(f"🗑️ {c['nom']}", key=f"dc_{i}"):
+                    retirer("crypto", c, c.get("prix_actuel_usd", c["prix_achat_usd"]))
+                    data["crypto"].pop(i)
+                    save_data(data, st.session_state.base_persistee)
+                    st.rerun()
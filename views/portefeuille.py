@@ -0,0 +1,85 @@
+import streamlit as st
+import pandas as pd
+
+import render
+
+# ============== PAGE PORTEFEUILLE ==============
+
+LABEL = "📈 Portefeuille"
+DEPENDS = ("data", "valo", "marches")
+
+def show(ctx):
+    data, valo = ctx["data"], ctx["valo"]
+    market_open = any(ctx["marches"].values())
+    taux, immo = valo["taux"], data["immobilier"]
+    total_bourse_actuel, total_bourse_investi = valo["total_bourse_actuel"], valo["total_bourse_investi"]
+    total_crypto_actuel, total_crypto_investi = valo["total_crypto_actuel"], valo["total_crypto_investi"]
+    immo_val, immo_investi, gain_immo = valo["immo_val"], valo["immo_investi"], valo["gain_immo"]
+    interets_b, interets_l = valo["interets_b"], valo["interets_l"]
+    patrimoine, total_investi, gain_total = valo["patrimoine"], valo["total_investi"], valo["gain_total"]
+    perf_symbol = "+" if gain_total > 0 else ""
+
+    st.markdown('<p class="section-title">📂 PORTEFEUILLE DÉTAILLÉ</p>', unsafe_allow_html=True)
+    
+    st.markdown(f"""
+    <div class="section-card">
+        <div style="display: grid; grid-template-columns: repeat(3, 1fr); gap: 20px; text-align: center;">
+            <div><div style="color: #6b7280; font-size: 11px;">TOTAL INVESTI</div><div style="color: #fff; font-size: 24px; font-weight: 800;">{total_investi:,.2f}€</div></div>
+            <div><div style="color: #6b7280; font-size: 11px;">VALEUR ACTUELLE</div><div style="color: #fff; font-size: 24px; font-weight: 800;">{patrimoine:,.2f}€</div></div>
+            <div><div style="color: #6b7280; font-size: 11px;">GAIN TOTAL</div><div style="color: {'#4ade80' if gain_total > 0 else '#f87171'}; font-size: 24px; font-weight: 800;">{perf_symbol}{gain_total:,.2f}€</div></div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    tabs = st.tabs(["📈 ACTIONS", "₿ CRYPTO", "🏠 IMMO"])
+    
+    with tabs[0]:
+        market_status = "🟢 Marché ouvert" if market_open else "🟡 Marché fermé"
+        st.markdown(f"**Investi: {total_bourse_investi:,.2f}€** → **Actuel: {total_bourse_actuel:,.2f}€** • {market_status}")
+        
+        positions = sorted(data["bourse"], key=lambda x: x.get("valeur_actuelle", 0), reverse=True)
+        if len(positions) <= render.CARD_LIMIT:
+            st.markdown(render.stock_cards(positions), unsafe_allow_html=True)
+        else:
+            st.dataframe(pd.DataFrame({
+                "Nom": [p["nom"] for p in positions], "Ticker": [p["ticker"] for p in positions],
+                "Valeur": [p.get("valeur_actuelle", 0) for p in positions], "Perf": [p.get("perf", 0) for p in positions],
+                "Gain": [p.get("gain", 0) for p in positions], "Quantité": [p["qty"] for p in positions],
+                "Prix d'achat": [p["prix_achat"] for p in positions], "Prix actuel": [p.get("prix_actuel", p["prix_achat"]) for p in positions],
+            }), hide_index=True, use_container_width=True, height=500, column_config={
+                "Valeur": st.column_config.NumberColumn(format="%.2f€"), "Perf": st.column_config.NumberColumn(format="%+.2f%%"),
+                "Gain": st.column_config.NumberColumn(format="%+.2f€")})
+    
+    with tabs[1]:
+        staking_gains = valo["staking_gains_eur"]
+        st.markdown(f"**Investi: {total_crypto_investi:,.2f}€** → **Actuel: {total_crypto_actuel:,.2f}€** • Gains staking: +{staking_gains:,.2f}€")
+        
+        dispo_eur = data["crypto_extras"]["disponible_usd"] * taux
+        st.markdown(f'<div class="section-card" style="border:1px solid #3b82f6;"><div style="display:flex; justify-content:space-between;"><span style="color:#3b82f6; font-weight:700;">💵 Disponible</span><div style="text-align:right;"><div style="color:#fff; font-weight:700;">{dispo_eur:,.2f}€</div><div style="color:#8E8E93; font-size:13px;">{data["crypto_extras"]["disponible_usd"]:.2f}$</div></div></div></div>', unsafe_allow_html=True)
+        
+        positions = sorted(data["crypto"], key=lambda x: x.get("valeur_actuelle_eur", 0), reverse=True)
+        if len(positions) <= render.CARD_LIMIT:
+            st.markdown(render.crypto_cards(positions), unsafe_allow_html=True)
+        else:
+            st.dataframe(pd.DataFrame({
+                "Nom": [c["nom"] for c in positions], "Staké": [bool(c.get("is_staked")) for c in positions],
+                "Valeur": [c.get("valeur_actuelle_eur", 0) for c in positions], "Perf": [c.get("perf", 0) for c in positions],
+                "Gain": [c.get("gain_eur", 0) for c in positions], "Quantité": [c["qty"] for c in positions],
+                "Prix actuel $": [c.get("prix_actuel_usd", c["prix_achat_usd"]) for c in positions],
+                "Var. 24h": [c.get("change_24h", 0) for c in positions],
+            }), hide_index=True, use_container_width=True, height=500, column_config={
+                "Valeur": st.column_config.NumberColumn(format="%.2f€"), "Perf": st.column_config.NumberColumn(format="%+.2f%%"),
+                "Gain": st.column_config.NumberColumn(format="%+.2f€"), "Var. 24h": st.column_config.NumberColumn(format="%+.2f%%")})
+        
+        st.markdown("### 🔄 DCA programmés")
+        st.markdown(render.dca_cards(data["dca_orders"], detail=True), unsafe_allow_html=True)
+    
+    with tabs[2]:
+        st.markdown(f"**Investi: {immo_investi:,.2f}€** → **Actuel: {immo_val:,.2f}€** • Intérêts: +{gain_immo:,.2f}€")
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            st.markdown(f'<div class="section-card" style="border:2px solid #10b981;"><div style="color:#10b981; font-weight:700;">🧱 Bricks Bloqué</div><div style="font-size:2em; font-weight:900; color:#fff;">{immo["bricks_bloque"]:,.0f}€</div><div style="color:#4ade80;">+{interets_b:.2f}€ ({immo["taux_bloque"]*100:.1f}%)</div></div>', unsafe_allow_html=True)
+        with c2:
+            st.markdown(f'<div class="section-card" style="border:2px solid #3b82f6;"><div style="color:#3b82f6; font-weight:700;">🧱 Bricks Libre</div><div style="font-size:2em; font-weight:900; color:#fff;">{immo["bricks_libre"]:,.0f}€</div><div style="color:#4ade80;">+{interets_l:.2f}€ ({immo["taux_libre"]*100:.1f}%)</div></div>', unsafe_allow_html=True)
+        with c3:
+            st.markdown(f'<div class="section-card" style="border:2px solid #8b5cf6;"><div style="color:#8b5cf6; font-weight:700;">👑 Royaltiz</div><div style="font-size:2em; font-weight:900; color:#fff;">{immo["royaltiz"]:,.0f}€</div></div>', unsafe_allow_html=True)
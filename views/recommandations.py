@@ -0,0 +1,84 @@
+import streamlit as st
+import plotly.graph_objects as go
+
+import figures
+from risk import analyze_risk
+
+# ============== PAGE RECOMMANDATIONS ==============
+
+LABEL = "🎯 Recommandations"
+DEPENDS = ("data", "analysis")
+
+def show(ctx):
+    data = ctx["data"]
+
+    st.markdown('<p class="section-title">🎯 RECOMMANDATIONS</p>', unsafe_allow_html=True)
+    analysis = ctx["analysis"]
+    
+    c1, c2, c3 = st.columns([1, 2, 1])
+    with c2:
+        sc = analysis["score"]
+        col = "#4ade80" if sc >= 70 else "#fbbf24" if sc >= 50 else "#f87171"
+        st.markdown(f'<div class="score-container" style="border-color:{col};"><div style="color:#6b7280; font-size:12px;">SCORE DE SANTÉ</div><div class="score-value" style="color:{col};">{sc}/100</div></div>', unsafe_allow_html=True)
+    
+    st.markdown("---")
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown("### 🌍 Géographie")
+        geo = analysis["geo_pct"]
+        if geo:
+            def build():
+                fig = go.Figure(go.Bar(x=list(geo.values()), y=list(geo.keys()), orientation='h', marker_color=['#3b82f6' if v < 40 else '#f87171' for v in geo.values()], text=[f"{v:.1f}%" for v in geo.values()], textposition='auto'))
+                fig.update_layout(height=250, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(20,20,32,1)', font=dict(color='#fff'), margin=dict(t=10, b=10, l=10, r=10), xaxis=dict(showgrid=False, showticklabels=False))
+                return fig
+            st.plotly_chart(figures.cached_figure("geo", geo, build), use_container_width=True)
+    with c2:
+        st.markdown("### 📊 Secteurs")
+        sec = analysis["sec_pct"]
+        if sec:
+            def build():
+                fig = go.Figure(go.Bar(x=list(sec.values()), y=list(sec.keys()), orientation='h', marker_color=['#10b981' if v < 30 else '#fbbf24' if v < 50 else '#f87171' for v in sec.values()], text=[f"{v:.1f}%" for v in sec.values()], textposition='auto'))
+                fig.update_layout(height=250, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(20,20,32,1)', font=dict(color='#fff'), margin=dict(t=10, b=10, l=10, r=10), xaxis=dict(showgrid=False, showticklabels=False))
+                return fig
+            st.plotly_chart(figures.cached_figure("secteurs", sec, build), use_container_width=True)
+    
+    st.markdown("### 📉 Analyse de risque (1 an)")
+    risque = analyze_risk(data)
+    if risque is None:
+        st.info("Historique des cours indisponible : analyse de risque impossible pour le moment")
+    else:
+        c1, c2, c3, c4, c5 = st.columns(5)
+        c1.metric("Volatilité", f"{risque['volatilite']:.1f}%")
+        c2.metric("Max drawdown", f"{risque['max_drawdown']:.1f}%")
+        c3.metric("Sharpe", f"{risque['sharpe']:.2f}")
+        c4.metric("Sortino", f"{risque['sortino']:.2f}")
+        c5.metric(f"Bêta vs {risque['benchmark']}", f"{risque['beta']:.2f}" if risque["beta"] is not None else "—")
+        c1, c2 = st.columns(2)
+        with c1:
+            def build():
+                fig = go.Figure(go.Scatter(x=risque["dates"], y=risque["volatilite_glissante"], line=dict(color='#f59e0b', width=2)))
+                fig.update_layout(height=300, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(20,20,32,1)', font=dict(color='#fff'), margin=dict(t=30, b=10, l=10, r=10), title=dict(text="Volatilité glissante 1 mois", font=dict(size=13)), xaxis=dict(showgrid=False), yaxis=dict(gridcolor='#1e1e2e', ticksuffix="%"))
+                return fig
+            st.plotly_chart(figures.cached_figure("risque.volatilite", (risque["dates"], risque["volatilite_glissante"]), build), use_container_width=True)
+        with c2:
+            # Au-delà de 30 lignes la matrice devient illisible : on garde les plus grosses positions
+            top = risque["actifs"]["poids"].nlargest(30).index
+            corr = risque["correlation"].loc[top, top]
+            def build():
+                fig = go.Figure(go.Heatmap(z=corr.values, x=list(top), y=list(top), zmin=-1, zmax=1, colorscale="RdBu", reversescale=True))
+                fig.update_layout(height=300, paper_bgcolor='rgba(0,0,0,0)', font=dict(color='#fff'), margin=dict(t=30, b=10, l=10, r=10), title=dict(text="Corrélations", font=dict(size=13)))
+                return fig
+            st.plotly_chart(figures.cached_figure("risque.correlation", corr, build), use_container_width=True)
+        with st.expander("Détail par ligne"):
+            st.dataframe(risque["actifs"].style.format({"poids": "{:.1f}%", "volatilite": "{:.1f}%", "max_drawdown": "{:.1f}%", "beta": "{:.2f}"}), use_container_width=True)
+        if risque["manquants"]:
+            st.caption(f"Sans historique (exclus) : {', '.join(risque['manquants'])}")
+    
+    st.markdown("### 💡 Actions recommandées")
+    for r in analysis["reco"]:
+        prio_class = f"reco-{r['prio']}"
+        prio_label = {"high": "🔴 HAUTE", "medium": "🟡 MOYENNE", "low": "🟢 BASSE"}[r["prio"]]
+        st.markdown(f'<div class="reco-card {prio_class}"><div style="display:flex; justify-content:space-between; margin-bottom:15px;"><span style="font-size:1.2em;">{r["icon"]} <strong style="color:#fff;">{r["title"]}</strong></span><span style="font-size:12px; color:#8E8E93;">{prio_label}</span></div><p style="color:#e0e0e0; margin-bottom:15px;">{r["detail"]}</p><p style="color:#4ade80; font-weight:600;">💡 {r["action"]}</p></div>', unsafe_allow_html=True)
+        if r.get("suggestions"):
+            for s in r["suggestions"]:
+                st.markdown(f'<span class="chip"><strong>{s["nom"]}</strong> ({s["ticker"]})</span>', unsafe_allow_html=True)
@@ -0,0 +1,36 @@
+import streamlit as st
+
+# ============== PAGE REVENUS ==============
+
+LABEL = "💸 Revenus"
+DEPENDS = ("valo",)
+
+def show(ctx):
+    valo = ctx["valo"]
+    gain_immo = valo["gain_immo"]
+
+    st.markdown('<p class="section-title">💸 REVENUS PASSIFS</p>', unsafe_allow_html=True)
+    
+    div_mens = valo["dividendes_mensuels"]
+    staking_mens = valo["staking_gains_eur"] / 6
+    immo_mens = gain_immo / 6
+    total_passif = div_mens + staking_mens + immo_mens
+    objectif = 500
+    progress = min(total_passif / objectif * 100, 100)
+    
+    st.markdown(f'''<div class="dividend-goal">
+        <div style="display:flex; justify-content:space-between; align-items:center;">
+            <h2 style="color:#4ade80; margin:0;">🎯 Objectif 500€/mois</h2>
+            <span style="background:#22543d; padding:8px 16px; border-radius:12px; color:#4ade80; font-weight:700;">{progress:.1f}%</span>
+        </div>
+        <div style="font-size:64px; font-weight:900; color:#fff; margin:20px 0;">{total_passif:.2f}€<span style="font-size:24px; color:#6b7280;">/mois</span></div>
+        <div class="dividend-progress"><div class="dividend-fill" style="width:{progress}%;">{progress:.1f}%</div></div>
+    </div>''', unsafe_allow_html=True)
+    
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        st.markdown(f'<div class="mini-card" style="border:2px solid #3b82f6;"><div style="font-size:24px;">📈</div><div class="mini-value" style="color:#4ade80;">{div_mens:.2f}€</div><div class="mini-title">Dividendes</div></div>', unsafe_allow_html=True)
+    with c2:
+        st.markdown(f'<div class="mini-card" style="border:2px solid #f59e0b;"><div style="font-size:24px;">⛓️</div><div class="mini-value" style="color:#4ade80;">{staking_mens:.2f}€</div><div class="mini-title">Staking</div></div>', unsafe_allow_html=True)
+    with c3:
+        st.markdown(f'<div class="mini-card" style="border:2px solid #10b981;"><div style="font-size:24px;">🏠</div><div class="mini-value" style="color:#4ade80;">{immo_mens:.2f}€</div><div class="mini-title">Immobilier</div></div>', unsafe_allow_html=True)
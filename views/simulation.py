@@ -0,0 +1,112 @@
+import streamlit as st
+import plotly.graph_objects as go
+import pandas as pd
+import numpy as np
+
+import figures
+from market_data import get_monthly_returns
+from projection import monthly_rate, project, periods_to_target, scenario_grid, lognormal_returns, bootstrap_returns, monte_carlo
+
+# ============== PAGE SIMULATION ==============
+
+LABEL = "💹 Simulation"
+DEPENDS = ("resume",)
+
+def show(ctx):
+    patrimoine = ctx["resume"]["patrimoine"]
+
+    st.markdown('<p class="section-title">💹 SIMULATION</p>', unsafe_allow_html=True)
+    c1, c2 = st.columns(2)
+    with c1:
+        apport = st.number_input("Apport mensuel €", value=500, step=100)
+        rend = st.slider("Rendement %", 0, 20, 8)
+    with c2:
+        duree = st.slider("Années", 1, 30, 10)
+        capital = st.number_input("Capital initial", value=int(patrimoine), step=1000)
+    
+    mois = duree * 12
+    tm = monthly_rate(rend)
+    proj = project(capital, apport, tm, mois)
+    
+    # Jour normalisé : mêmes dates d'un rerun à l'autre, donc même figure en cache
+    dates = pd.date_range(start=pd.Timestamp.today().normalize(), periods=mois+1, freq='ME')
+    def build():
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=dates, y=proj, mode='lines', fill='tozeroy', line=dict(color='#4ade80', width=3), fillcolor='rgba(74,222,128,0.1)'))
+        fig.add_hline(y=100000, line_dash="dash", line_color="#f59e0b", annotation_text="100k€")
+        fig.update_layout(height=400, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(20,20,32,1)', font=dict(color='#fff'), xaxis=dict(showgrid=False), yaxis=dict(showgrid=True, gridcolor='#1e1e2e', tickformat=',.0f'))
+        return fig
+    st.plotly_chart(figures.cached_figure("simulation", (dates, proj), build), use_container_width=True)
+    
+    final = proj[-1]
+    verse = capital + apport * mois
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Valeur finale", f"{final:,.0f}€")
+    c2.metric("Versé", f"{verse:,.0f}€")
+    c3.metric("Gains", f"{final - verse:,.0f}€")
+    n100k = periods_to_target(capital, apport, tm, 100000)
+    if n100k <= mois:
+        i = int(n100k)
+        c4.metric("100k€", f"{i//12}a {i%12}m")
+    else:
+        c4.metric("100k€", "Non atteint")
+    
+    # Grille rendement x apport calculée en un seul appel
+    with st.expander("🧮 Comparer des scénarios"):
+        rendements = list(range(0, 21, 2))
+        apports = sorted({max(0, int(apport * k)) for k in (0.5, 0.75, 1, 1.5, 2)})
+        finale, n_cible = scenario_grid(capital, apports, rendements, mois, 100000)
+        st.markdown(f"**Valeur finale après {duree} ans**")
+        st.dataframe(pd.DataFrame(finale, index=[f"{r}%" for r in rendements], columns=[f"{a}€/mois" for a in apports]).style.format("{:,.0f}€"), use_container_width=True)
+        st.markdown("**Temps pour atteindre 100k€**")
+        delais = [[f"{int(n)//12}a {int(n)%12}m" if np.isfinite(n) else "—" for n in ligne] for ligne in n_cible]
+        st.dataframe(pd.DataFrame(delais, index=[f"{r}%" for r in rendements], columns=[f"{a}€/mois" for a in apports]), use_container_width=True)
+    
+    # ===== MONTE CARLO =====
+    st.markdown("---")
+    st.markdown("#### 🎲 Simulation Monte Carlo")
+    if st.checkbox("Activer le mode stochastique", value=False):
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            source = st.selectbox("Rendements", ["Paramétrique (log-normal)", "Historique (bootstrap)"])
+        with c2:
+            if source.startswith("Paramétrique"):
+                vol = st.slider("Volatilité annuelle %", 1, 40, 15)
+            else:
+                ticker_ref = st.text_input("Ticker de référence", value="CW8.PA").strip().upper()
+        with c3:
+            n_paths = st.selectbox("Trajectoires", [10000, 50000], index=1, format_func=lambda n: f"{n:,}".replace(",", " "))
+        
+        draw = None
+        if source.startswith("Paramétrique"):
+            draw = lognormal_returns(rend, vol)
+        else:
+            with st.spinner("📥 Historique mensuel..."):
+                rendements_hist = get_monthly_returns(ticker_ref)
+            if rendements_hist is None or len(rendements_hist) < 12:
+                st.error(f"❌ Historique insuffisant pour {ticker_ref}.")
+            else:
+                draw = bootstrap_returns(rendements_hist)
+                st.caption(f"{len(rendements_hist)} rendements mensuels de {ticker_ref} rééchantillonnés.")
+        
+        if draw is not None:
+            mc = monte_carlo(capital, apport, mois, draw, n_paths=n_paths, cible=100000, seed=42)
+            x = dates[mc["mois"]]
+            pct = mc["percentiles"]
+            def build():
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(x=x, y=pct[95], mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'))
+                fig.add_trace(go.Scatter(x=x, y=pct[5], mode='lines', line=dict(width=0), fill='tonexty', fillcolor='rgba(74,222,128,0.1)', name='5% - 95%'))
+                fig.add_trace(go.Scatter(x=x, y=pct[75], mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'))
+                fig.add_trace(go.Scatter(x=x, y=pct[25], mode='lines', line=dict(width=0), fill='tonexty', fillcolor='rgba(74,222,128,0.25)', name='25% - 75%'))
+                fig.add_trace(go.Scatter(x=x, y=pct[50], mode='lines', line=dict(color='#4ade80', width=3), name='Médiane'))
+                fig.add_hline(y=100000, line_dash="dash", line_color="#f59e0b", annotation_text="100k€")
+                fig.update_layout(height=400, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(20,20,32,1)', font=dict(color='#fff'), xaxis=dict(showgrid=False), yaxis=dict(showgrid=True, gridcolor='#1e1e2e', tickformat=',.0f'), legend=dict(orientation="h", y=1.08, x=0.5, xanchor="center"))
+                return fig
+            st.plotly_chart(figures.cached_figure("monte_carlo", (x, pct), build), use_container_width=True)
+            
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Médiane finale", f"{pct[50][-1]:,.0f}€")
+            c2.metric("Pessimiste (5%)", f"{pct[5][-1]:,.0f}€")
+            c3.metric("Optimiste (95%)", f"{pct[95][-1]:,.0f}€")
+            c4.metric("Proba. 100k€", f"{mc['proba_cible'] * 100:.1f}%")